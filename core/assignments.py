@@ -0,0 +1,108 @@
+"""Assignment of classes, subjects, levels, semesters and periods.
+
+Shared by the teacher and class forms. Posted values are normalized once
+(Persian digits included), reference rows are resolved through
+``core.reference`` and many-to-many fields are written in bulk, so a save
+costs a fixed number of queries however many values are ticked.
+
+``sync`` replaces the related objects of one instance by diffing its rows
+in the through table: one query reads the current ids, one checks that the
+new ids exist, and at most one DELETE and one bulk INSERT apply the
+difference. ``m2m_changed`` is sent with the same actions and ``pk_set``
+values as ``RelatedManager.add()`` / ``remove()``, so receivers behave as
+if ``set()`` had been called.
+"""
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed
+
+from . import reference
+from .dates import to_ascii_digits
+
+# levels whose classes belong to a period rather than a semester
+PERIOD_LEVELS = ('ebtedai', 'moteseta')
+
+
+def parse_number(value):
+	"""``value`` as an int (Persian digits allowed), or ``None`` if it is not a number."""
+	try:
+		return int(to_ascii_digits(value).strip())
+	except ValueError:
+		return None
+
+
+def parse_numbers(values) -> set:
+	"""Posted ids or numbers as a set of ints; anything that is not a number is ignored."""
+	numbers = {parse_number(value) for value in values}
+	numbers.discard(None)
+	return numbers
+
+
+def sync(instance, field_name: str, ids, verified=False) -> tuple:
+	"""Make ``instance.<field_name>`` hold exactly the objects with ``ids``.
+
+	Ids of rows that do not exist are dropped; pass ``verified=True`` for
+	ids read from existing rows to skip that check. Returns the ``(added,
+	removed)`` id sets.
+	"""
+	field = instance._meta.get_field(field_name)
+	through = field.remote_field.through
+	model = field.related_model
+	source = f'{field.m2m_field_name()}_id'
+	target = f'{field.m2m_reverse_field_name()}_id'
+	db = router.db_for_write(through, instance=instance)
+	rows = through._default_manager.using(db).filter(**{source: instance.pk})
+
+	ids = set(ids)
+	current = set(rows.values_list(target, flat=True))
+	removed = current - ids
+	added = ids - current
+	if added and not verified:
+		added = set(model._default_manager.using(db).filter(pk__in=added).values_list('pk', flat=True))
+	if not added and not removed:
+		return added, removed
+
+	signal_kwargs = dict(sender=through, instance=instance, reverse=False, model=model, using=db)
+	with transaction.atomic(using=db, savepoint=False):
+		if removed:
+			m2m_changed.send(action='pre_remove', pk_set=removed, **signal_kwargs)
+			rows.filter(**{f'{target}__in': removed}).delete()
+			m2m_changed.send(action='post_remove', pk_set=removed, **signal_kwargs)
+		if added:
+			m2m_changed.send(action='pre_add', pk_set=added, **signal_kwargs)
+			through._default_manager.using(db).bulk_create([
+				through(**{source: instance.pk, target: pk}) for pk in added
+			])
+			m2m_changed.send(action='post_add', pk_set=added, **signal_kwargs)
+	return added, removed
+
+
+def assign_teacher(teacher, data) -> None:
+	"""Apply the classes, subjects, levels, semesters and periods posted with the teacher form."""
+	levels = reference.get().levels_by_code
+	level_ids = {levels[code].id for code in data.getlist('levels') if code in levels}
+	semesters = reference.semesters_for(parse_numbers(data.getlist('semesters')))
+	periods = reference.periods_for(parse_numbers(data.getlist('periods_ebtedai') + data.getlist('periods_moteseta')))
+	with transaction.atomic():
+		sync(teacher, 'classes', parse_numbers(data.getlist('classes')))
+		sync(teacher, 'subjects', parse_numbers(data.getlist('subjects')))
+		sync(teacher, 'levels', level_ids, verified=True)
+		sync(teacher, 'semesters', {s.id for s in semesters}, verified=True)
+		sync(teacher, 'periods', {p.id for p in periods}, verified=True)
+
+
+def assign_class_term(klass, data) -> None:
+	"""Set the semester (عالی) or period (ابتداییه/متوسطه) posted with the class form.
+
+	The one that does not apply to the class's level is cleared. The class
+	is not saved.
+	"""
+	level = reference.level_by_id(klass.level_id)
+	code = level.code if level else ''
+	klass.semester = klass.period = None
+	if code == 'aali':
+		number = parse_number(data.get('semester', ''))
+		semesters = reference.semesters_for({number}) if number is not None else []
+		klass.semester = semesters[0] if semesters else None
+	elif code in PERIOD_LEVELS:
+		period_id = parse_number(data.get('period', ''))
+		klass.period = reference.period_by_id(period_id)
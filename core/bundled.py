@@ -0,0 +1,87 @@
+"""In-memory serving of files that ship with the app (logo, font).
+
+Each file in ``FILES`` is read once per process and kept as bytes together
+with its ETag and modification time, so requests never touch the disk.
+Conditional requests (``If-None-Match`` / ``If-Modified-Since``) are
+answered with 304. Templates link to ``url(name)``, which carries the
+content digest as ``?v=``; such versioned URLs are cached for a year as
+immutable, unversioned ones for a day.
+"""
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+FILES = {
+	# name (also the URL name): (path below BASE_DIR, content type)
+	'logo': (os.path.join('core', 'images', 'logo.jpg'), 'image/jpeg'),
+	# Persian subset of B-NAZANIN.TTF, written by the build_font_subset command
+	'font': (os.path.join('core', 'fonts', 'B_NAZANIN', 'B-NAZANIN.subset.ttf'), 'font/ttf'),
+}
+
+MAX_AGE = 60 * 60 * 24
+VERSIONED_MAX_AGE = 60 * 60 * 24 * 365
+
+_files = {}
+_lock = threading.Lock()
+
+
+class BundledFile:
+	"""Contents and validators of one bundled file."""
+
+	def __init__(self, path, content_type):
+		with open(path, 'rb') as fh:
+			self.data = fh.read()
+		self.path = path
+		self.content_type = content_type
+		self.last_modified = int(os.path.getmtime(path))
+		self.digest = hashlib.sha256(self.data).hexdigest()[:16]
+		self.etag = f'"{self.digest}"'
+
+
+def path(name: str) -> str:
+	"""Absolute path of the bundled file ``name``."""
+	return os.path.join(settings.BASE_DIR, FILES[name][0])
+
+
+def get(name: str) -> BundledFile:
+	"""The bundled file ``name``, read on first use; raises ``OSError`` if it is missing."""
+	bundled = _files.get(name)
+	if bundled is None:
+		with _lock:
+			bundled = _files.get(name)
+			if bundled is None:
+				bundled = _files[name] = BundledFile(path(name), FILES[name][1])
+	return bundled
+
+
+def url(name: str) -> str:
+	"""Versioned URL of the bundled file ``name``."""
+	try:
+		return f'{reverse(f"core:{name}")}?v={get(name).digest}'
+	except OSError:
+		return reverse(f'core:{name}')
+
+
+def serve(request, name: str) -> HttpResponse:
+	"""Respond with the bundled file ``name``, or 304 when the client's copy is current."""
+	try:
+		bundled = get(name)
+	except OSError:
+		raise Http404(f'{name} not found')
+	response = get_conditional_response(request, etag=bundled.etag, last_modified=bundled.last_modified)
+	if response is None:
+		response = HttpResponse(bundled.data, content_type=bundled.content_type)
+		response['Content-Length'] = len(bundled.data)
+	response['ETag'] = bundled.etag
+	response['Last-Modified'] = http_date(bundled.last_modified)
+	if request.GET.get('v') == bundled.digest:
+		patch_cache_control(response, public=True, max_age=VERSIONED_MAX_AGE, immutable=True)
+	else:
+		patch_cache_control(response, public=True, max_age=MAX_AGE)
+	return response
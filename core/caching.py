@@ -0,0 +1,92 @@
+"""Shared cache keyed by per-model generations.
+
+Every worker process talks to the same cache (``CACHES['default']``, a
+file-based store), so per-process memoization is never trusted on its own.
+Each tracked model has a *generation*: a random token stored in the cache
+and replaced by ``core.signals`` whenever a row of the model is saved,
+deleted or has its many-to-many relations changed (and by the bulk writers
+that send no signals). Cached values are stored under keys that embed the
+generations of every model they were computed from, so a write in one
+worker retires the matching entries in all of them; stale entries are
+never read again and simply expire.
+
+Generations are random tokens rather than counters: a read-modify-write
+increment is not atomic on the file backend, while a fresh token written
+after the transaction commits always differs from the one any older entry
+was stored under. A token lost to culling is replaced by a new one.
+"""
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+GENERATION_KEY = 'core:generation:{label}'
+# entries are retired by generation changes; the timeout only frees space
+CACHE_TIMEOUT = 60 * 60
+
+_MISSING = object()
+
+
+def _generation_key(model) -> str:
+	return GENERATION_KEY.format(label=model._meta.label_lower)
+
+
+def generations(*models) -> tuple:
+	"""The current generation tokens of ``models``, read in one cache call."""
+	keys = [_generation_key(model) for model in models]
+	found = cache.get_many(keys)
+	for key in keys:
+		if key not in found:
+			cache.add(key, uuid.uuid4().hex, None)
+			found[key] = cache.get(key)
+	return tuple(found[key] for key in keys)
+
+
+def bump(*models) -> None:
+	"""Start a new generation of ``models`` once the current transaction commits."""
+	if not models:
+		return
+	def _bump():
+		cache.set_many({_generation_key(model): uuid.uuid4().hex for model in models}, None)
+	transaction.on_commit(_bump)
+
+
+def bump_sender(sender, **kwargs) -> None:
+	"""``post_save`` / ``post_delete`` receiver."""
+	bump(sender)
+
+
+def bump_m2m(sender, instance, action, model, **kwargs) -> None:
+	"""``m2m_changed`` receiver: both ends of the relation change.
+
+	Reference rows (levels, semesters, periods) are not changed by being
+	linked; their generations are left to ``reference.invalidate`` so that
+	assigning a semester does not reload every worker's registry.
+	"""
+	from .reference import MODELS as REFERENCE_MODELS
+
+	if action in ('post_add', 'post_remove', 'post_clear'):
+		bump(*(m for m in (type(instance), model) if m not in REFERENCE_MODELS))
+
+
+def make_key(name: str, models, *parts) -> str:
+	"""Cache key for ``name`` with ``parts``, valid until one of ``models`` changes."""
+	payload = json.dumps([generations(*models), parts], default=str)
+	return f'core:{name}:{hashlib.md5(payload.encode("utf-8")).hexdigest()}'
+
+
+def memoize(name: str, models, parts, compute, timeout=CACHE_TIMEOUT):
+	"""Return the cached result of ``compute()`` for ``parts``, computing it on a miss.
+
+	The generations are read before ``compute`` runs, so a value computed
+	while a write commits is stored under the old generation and never read.
+	"""
+	key = make_key(name, models, *parts)
+	value = cache.get(key, _MISSING)
+	if value is _MISSING:
+		value = compute()
+		cache.set(key, value, timeout)
+	return value
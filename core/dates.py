@@ -0,0 +1,62 @@
+"""Jalali (Shamsi) calendar helpers shared by views and PDF rendering."""
+
+# Afghan solar month names, as used on printed documents
+AFGHAN_MONTHS = (
+	'حمل', 'ثور', 'جوزا', 'سرطان', 'اسد', 'سنبله',
+	'میزان', 'عقرب', 'قوس', 'جدی', 'دلو', 'حوت',
+)
+
+_PERSIAN_DIGITS = str.maketrans('0123456789', '۰۱۲۳۴۵۶۷۸۹')
+# Persian and Arabic-Indic digits, as typed on Persian and Arabic keyboards
+_ASCII_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+
+
+def to_persian_digits(value) -> str:
+	"""Return ``value`` as a string with ASCII digits replaced by Persian ones."""
+	return str(value).translate(_PERSIAN_DIGITS)
+
+
+def to_ascii_digits(value) -> str:
+	"""Return ``value`` as a string with Persian and Arabic digits replaced by ASCII ones."""
+	return str(value).translate(_ASCII_DIGITS)
+
+
+def gregorian_to_jalali(gy: int, gm: int, gd: int):
+	"""Convert Gregorian date to Jalali (Shamsi). Returns (jy, jm, jd)."""
+	g_d_m = [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334]
+	if gy > 1600:
+		jy = 979
+		gy -= 1600
+	else:
+		jy = 0
+		gy -= 621
+	gy2 = gy + 1 if gm > 2 else gy
+	days = (
+		365 * gy
+		+ (gy2 + 3) // 4
+		- (gy2 + 99) // 100
+		+ (gy2 + 399) // 400
+		- 80
+		+ gd
+		+ g_d_m[gm - 1]
+	)
+	jy += 33 * (days // 12053)
+	days %= 12053
+	jy += 4 * (days // 1461)
+	days %= 1461
+	if days > 365:
+		jy += (days - 1) // 365
+		days = (days - 1) % 365
+	if days < 186:
+		jm = 1 + days // 31
+		jd = 1 + days % 31
+	else:
+		jm = 7 + (days - 186) // 30
+		jd = 1 + (days - 186) % 30
+	return jy, jm, jd
+
+
+def afghan_date(value) -> str:
+	"""Format a ``date`` as "day month year" with Afghan month names, e.g. ``۱ حمل ۱۴۰۳``."""
+	jy, jm, jd = gregorian_to_jalali(value.year, value.month, value.day)
+	return f'{to_persian_digits(jd)} {AFGHAN_MONTHS[jm - 1]} {to_persian_digits(jy)}'
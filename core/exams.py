@@ -0,0 +1,207 @@
+"""Exam results for one student or a whole class.
+
+A student's results cover the subjects of their latest semester (their own
+highest semester, else the semester of their class). ``class_results``
+loads the students with one query and every subject of the semesters
+involved, together with the scores of those students, with one joined
+query, so the cost does not grow with the number of students.
+
+It also maintains ``SemesterResult``, the per-student, per-semester summary
+of StudentScore. ``refresh_semester_results`` re-aggregates just the
+affected ``(student, semester)`` pairs; it is called from the StudentScore
+signals in ``core.signals`` and from the bulk grade paths, which bypass
+signals.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Count, FilteredRelation, Q, Sum
+from django.db.models.functions import Coalesce
+
+from . import caching, reference, terms
+from .models import Student, Subject, StudentScore, SemesterResult
+
+
+PASS_MARK = 55
+PASSED = 'کامیاب'
+FAILED = 'مردود'
+UNKNOWN = 'نامشخص'
+
+
+class StudentResult:
+	"""Scores, totals, average and pass/fail of one student for one semester."""
+
+	def __init__(self, student, semester, subject_scores):
+		self.student = student
+		self.semester = semester
+		# [{'subject_name', 'score', 'status'}]; a missing score counts as 0
+		self.scores = []
+		self.total_score = 0
+		self.max_possible = 0
+		self.subjects_count = 0
+		for name, score in subject_scores:
+			score = score or 0
+			self.scores.append({
+				'subject_name': name,
+				'score': score,
+				'status': PASSED if score >= PASS_MARK else FAILED if score > 0 else '-',
+			})
+			if score > 0:
+				self.total_score += score
+				self.max_possible += 100
+				self.subjects_count += 1
+		percentage = (self.total_score / self.max_possible * 100) if self.max_possible > 0 else 0
+		average = (self.total_score / self.subjects_count) if self.subjects_count > 0 else 0
+		self.percentage = round(percentage, 2)
+		self.average = round(average, 2)
+		if self.subjects_count == 0:
+			self.overall_status = UNKNOWN
+		else:
+			self.overall_status = PASSED if average >= PASS_MARK else FAILED
+
+
+def result_students():
+	"""Students with what ``compute_results`` needs, loaded in one query."""
+	return Student.objects.select_related('school_class__semester')
+
+
+def latest_semester(student):
+	"""The semester a student's results are for, or ``None``.
+
+	``student`` must come from ``result_students()``.
+	"""
+	numbers = terms.to_numbers(student.semester_mask)
+	if numbers:
+		return reference.get_semester(numbers[-1])
+	if student.school_class and student.school_class.semester:
+		return student.school_class.semester
+	return None
+
+
+def compute_results(students) -> list:
+	"""Return a ``StudentResult`` per student, in the given order.
+
+	``students`` must come from ``result_students()``. Subjects and scores
+	are read with a single query that left-joins the scores of just these
+	students onto the subjects of their semesters.
+	"""
+	students = list(students)
+	semesters = {student.pk: latest_semester(student) for student in students}
+	numbers = {semester.number for semester in semesters.values() if semester is not None}
+	subjects = {}  # {semester number: [(subject id, name), ...]} in name order
+	scores = {}  # {(student id, subject id): score}
+	if numbers:
+		rows = (
+			Subject.objects.filter(semester__in=numbers)
+			.annotate(entry=FilteredRelation('studentscore', condition=Q(studentscore__student__in=[s.pk for s in students])))
+			.order_by('name', 'id')
+			.values_list('id', 'name', 'semester', 'entry__student_id', 'entry__score')
+		)
+		for subject_id, name, number, student_id, score in rows:
+			listed = subjects.setdefault(number, [])
+			if not listed or listed[-1][0] != subject_id:
+				listed.append((subject_id, name))
+			if student_id is not None:
+				scores[(student_id, subject_id)] = score
+	results = []
+	for student in students:
+		semester = semesters[student.pk]
+		subject_scores = []
+		if semester is not None:
+			subject_scores = [
+				(name, scores.get((student.pk, subject_id)))
+				for subject_id, name in subjects.get(semester.number, [])
+			]
+		results.append(StudentResult(student, semester, subject_scores))
+	return results
+
+
+def student_results(student) -> StudentResult:
+	"""Results of one student loaded through ``result_students()``."""
+	return compute_results([student])[0]
+
+
+def class_results(klass) -> list:
+	"""Results of every student of ``klass``, ordered by name."""
+	return compute_results(result_students().filter(school_class=klass).order_by('name', 'id'))
+
+
+def _aggregate_scores(scores):
+	"""Yield ``(student_id, semester, total, subjects_count)`` per pair in ``scores``."""
+	positive = Q(score__gt=0)
+	return (
+		scores.order_by()
+		.values_list('student_id', 'subject__semester')
+		.annotate(total=Coalesce(Sum('score', filter=positive), 0), subjects_count=Count('id', filter=positive))
+	)
+
+
+def _semester_result(student_id, semester, total, subjects_count) -> SemesterResult:
+	if subjects_count:
+		average = (Decimal(total) / subjects_count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+		status = 'passed' if average >= PASS_MARK else 'failed'
+	else:
+		average, status = Decimal(0), 'unknown'
+	return SemesterResult(
+		student_id=student_id, semester=semester, total=total,
+		subjects_count=subjects_count, average=average, status=status,
+	)
+
+
+def semester_pairs(student_subject_pairs) -> set:
+	"""Map ``(student_id, subject_id)`` pairs to ``(student_id, semester)`` with one query."""
+	student_subject_pairs = list(student_subject_pairs)
+	subject_ids = {subject_id for _, subject_id in student_subject_pairs}
+	if not subject_ids:
+		return set()
+	semesters = dict(Subject.objects.filter(pk__in=subject_ids).values_list('id', 'semester'))
+	return {
+		(student_id, semesters[subject_id])
+		for student_id, subject_id in student_subject_pairs
+		if subject_id in semesters
+	}
+
+
+def refresh_semester_results(pairs) -> None:
+	"""Recompute the summaries of the given ``(student_id, semester)`` pairs.
+
+	Pairs that no longer have any score rows lose their summary.
+	"""
+	pairs = set(pairs)
+	if not pairs:
+		return
+	scores = StudentScore.objects.filter(
+		student_id__in={student_id for student_id, _ in pairs},
+		subject__semester__in={semester for _, semester in pairs},
+	)
+	summaries = [
+		_semester_result(*row)
+		for row in _aggregate_scores(scores)
+		if (row[0], row[1]) in pairs
+	]
+	stale = pairs - {(r.student_id, r.semester) for r in summaries}
+	with transaction.atomic():
+		if summaries:
+			SemesterResult.objects.bulk_create(
+				summaries,
+				update_conflicts=True,
+				unique_fields=['student', 'semester'],
+				update_fields=['total', 'subjects_count', 'average', 'status', 'updated_at'],
+			)
+		if stale:
+			condition = Q()
+			for student_id, semester in stale:
+				condition |= Q(student_id=student_id, semester=semester)
+			SemesterResult.objects.filter(condition).delete()
+	# bulk writes send no signals
+	caching.bump(SemesterResult)
+
+
+def rebuild_semester_results(batch_size=500) -> int:
+	"""Replace every summary with one computed from the score table."""
+	summaries = [_semester_result(*row) for row in _aggregate_scores(StudentScore.objects.all())]
+	with transaction.atomic():
+		SemesterResult.objects.all().delete()
+		SemesterResult.objects.bulk_create(summaries, batch_size=batch_size)
+	caching.bump(SemesterResult)
+	return len(summaries)
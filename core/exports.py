@@ -0,0 +1,135 @@
+"""Streaming CSV and XLSX writers for tabular exports.
+
+Both writers take a header row and an iterable of rows and return a
+generator of chunks suitable for ``StreamingHttpResponse``, so an export is
+written out row by row instead of being built in memory first. The XLSX
+writer produces a minimal single-sheet workbook with the standard library
+``zipfile`` module and needs no third-party package.
+"""
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+
+class _Echo:
+	"""File-like object whose ``write`` returns the value instead of storing it."""
+
+	def write(self, value):
+		return value
+
+
+def stream_csv(header, rows):
+	"""Yield a UTF-8 CSV with a BOM so that Excel shows Persian text correctly."""
+	writer = csv.writer(_Echo())
+	yield '\ufeff'
+	yield writer.writerow(header)
+	for row in rows:
+		yield writer.writerow(['' if value is None else value for value in row])
+
+
+class _Sink:
+	"""Write-only, non-seekable file that hands written bytes back in chunks."""
+
+	def __init__(self):
+		self._chunks = []
+
+	def write(self, data):
+		self._chunks.append(bytes(data))
+		return len(data)
+
+	def flush(self):
+		pass
+
+	def take(self) -> bytes:
+		data = b''.join(self._chunks)
+		self._chunks.clear()
+		return data
+
+
+_CONTENT_TYPES = (
+	'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+	'<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+	'<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+	'<Default Extension="xml" ContentType="application/xml"/>'
+	'<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+	'<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+	'</Types>'
+)
+_ROOT_RELS = (
+	'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+	'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+	'<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+	'</Relationships>'
+)
+_WORKBOOK = (
+	'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+	'<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+	'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+	'<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+	'</workbook>'
+)
+_WORKBOOK_RELS = (
+	'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+	'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+	'<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+	'</Relationships>'
+)
+_SHEET_HEAD = (
+	'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+	'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+	'<sheetViews><sheetView rightToLeft="1" workbookViewId="0"/></sheetViews>'
+	'<sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+# characters that are not allowed in XML 1.0 documents
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# sheet names may not contain these and are limited to 31 characters
+_INVALID_SHEET_NAME = re.compile(r'[\[\]:*?/\\]')
+
+
+def _column(index: int) -> str:
+	"""Spreadsheet column letters for a zero-based index (0 -> A, 26 -> AA)."""
+	letters = ''
+	index += 1
+	while index:
+		index, rem = divmod(index - 1, 26)
+		letters = chr(65 + rem) + letters
+	return letters
+
+
+def _row_xml(number: int, values) -> str:
+	cells = []
+	for index, value in enumerate(values):
+		ref = f'{_column(index)}{number}'
+		if value is None or value == '':
+			continue
+		if isinstance(value, (int, float)) and not isinstance(value, bool):
+			cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+		else:
+			text = escape(_INVALID_XML.sub('', str(value)))
+			cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+	return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+def stream_xlsx(sheet_name, header, rows):
+	"""Yield the bytes of a single-sheet XLSX workbook, one row at a time."""
+	sheet_name = _INVALID_SHEET_NAME.sub(' ', str(sheet_name)).strip()[:31] or 'Sheet1'
+	sink = _Sink()
+	with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+		archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+		archive.writestr('_rels/.rels', _ROOT_RELS)
+		archive.writestr('xl/workbook.xml', _WORKBOOK.format(name=escape(sheet_name, {'"': '&quot;'})))
+		archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+		yield sink.take()
+		with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+			sheet.write(_SHEET_HEAD.encode())
+			sheet.write(_row_xml(1, header).encode())
+			for number, row in enumerate(rows, start=2):
+				sheet.write(_row_xml(number, row).encode())
+				chunk = sink.take()
+				if chunk:
+					yield chunk
+			sheet.write(_SHEET_TAIL.encode())
+	yield sink.take()
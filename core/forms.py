@@ -1,6 +1,19 @@
 from django import forms
 from .models import Student, SchoolClass, Subject, StudyLevel, CoursePeriod
 from .models import Teacher, TeacherContract
+from . import reference
+
+
+def _registry_choices(field, objects):
+    """Build a model choice field's choices from registry rows.
+
+    Rendering the field then needs no query; the field's queryset is still
+    used to validate submitted values.
+    """
+    choices = [(obj.pk, field.label_from_instance(obj)) for obj in objects]
+    if getattr(field, 'empty_label', None) is not None:
+        choices.insert(0, ('', field.empty_label))
+    return choices
 
 
 class StudentForm(forms.ModelForm):
@@ -59,12 +72,16 @@ class StudentForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        ref = reference.get()
         if 'level' in self.fields:
             self.fields['level'].required = True
+            self.fields['level'].choices = _registry_choices(self.fields['level'], ref.levels)
         if 'semesters' in self.fields:
             self.fields['semesters'].required = False
+            self.fields['semesters'].choices = _registry_choices(self.fields['semesters'], ref.semesters)
         if 'periods' in self.fields:
             self.fields['periods'].required = False
+            self.fields['periods'].choices = _registry_choices(self.fields['periods'], ref.periods)
 
     def clean(self):
         cleaned = super().clean()
@@ -119,6 +136,7 @@ class SchoolClassForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         if 'level' in self.fields:
             self.fields['level'].required = True
+            self.fields['level'].choices = _registry_choices(self.fields['level'], reference.get().levels)
 
 
 class SubjectForm(forms.ModelForm):
@@ -154,12 +172,15 @@ class SubjectForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        ref = reference.get()
         if 'level' in self.fields:
             self.fields['level'].required = True
             self.fields['level'].queryset = StudyLevel.objects.all()
+            self.fields['level'].choices = _registry_choices(self.fields['level'], ref.levels)
         if 'period' in self.fields:
             self.fields['period'].required = False
             self.fields['period'].queryset = CoursePeriod.objects.order_by('number')
+            self.fields['period'].choices = _registry_choices(self.fields['period'], ref.periods)
         if 'semester' in self.fields:
             self.fields['semester'].required = False
 
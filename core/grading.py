@@ -0,0 +1,123 @@
+"""Bulk score entry.
+
+Grade forms validate every submitted row in memory first and then hand the
+valid ``(student_id, subject_id, score)`` entries to ``save_scores``, which
+writes them with one upsert on the ``(student, subject)`` unique key inside
+a single transaction. ``build_gradebook`` loads the class x subject matrix
+used by the gradebook page and its exports with a fixed number of queries.
+"""
+from django.db import transaction
+
+from . import caching, exams
+from .models import Student, Subject, StudentScore
+
+
+SCORE_MIN = 0
+SCORE_MAX = 100
+
+
+def parse_score(value):
+	"""Parse a submitted score; returns ``(score, ok)``.
+
+	A blank value is a valid "no score" (``None``). Persian digits are
+	accepted because ``int()`` understands every Unicode decimal digit.
+	"""
+	value = (value or '').strip()
+	if value == '':
+		return None, True
+	try:
+		score = int(value)
+	except ValueError:
+		return None, False
+	if score < SCORE_MIN or score > SCORE_MAX:
+		return None, False
+	return score, True
+
+
+def save_scores(entries):
+	"""Create or update the given scores.
+
+	``entries`` is an iterable of ``(student_id, subject_id, score)``; when
+	the same pair appears more than once the last value wins. Returns two
+	sets of ``(student_id, subject_id)`` pairs, ``(created, updated)``. The
+	existing pairs are read inside the same transaction as the upsert, so
+	they describe exactly what the write did.
+	"""
+	scores = {}
+	for student_id, subject_id, score in entries:
+		scores[(student_id, subject_id)] = score
+	if not scores:
+		return set(), set()
+	student_ids = {student_id for student_id, _ in scores}
+	subject_ids = {subject_id for _, subject_id in scores}
+	with transaction.atomic():
+		existing = set(
+			StudentScore.objects.filter(student_id__in=student_ids, subject_id__in=subject_ids)
+			.values_list('student_id', 'subject_id')
+		)
+		StudentScore.objects.bulk_create(
+			[
+				StudentScore(student_id=student_id, subject_id=subject_id, score=score)
+				for (student_id, subject_id), score in scores.items()
+			],
+			update_conflicts=True,
+			unique_fields=['student', 'subject'],
+			update_fields=['score', 'updated_at'],
+		)
+		# bulk_create sends no signals; keep the semester summaries and the
+		# cache generation in step
+		exams.refresh_semester_results(exams.semester_pairs(scores))
+		caching.bump(StudentScore)
+	updated = existing.intersection(scores)
+	return set(scores) - updated, updated
+
+
+def class_subjects(klass):
+	"""Subjects taught in ``klass``: those of its period, else of its semester.
+
+	``klass.semester`` should be loaded with ``select_related``. When the
+	class has a level, only subjects of that (effective) level are included.
+	"""
+	subjects = Subject.objects.order_by('name', 'id')
+	if klass.period_id:
+		subjects = subjects.filter(period_id=klass.period_id)
+	elif klass.semester_id:
+		subjects = subjects.filter(semester=klass.semester.number)
+	else:
+		return subjects.none()
+	if klass.level_id:
+		subjects = subjects.filter(effective_level_id=klass.level_id)
+	return subjects
+
+
+class Gradebook:
+	"""Scores of every student of a class for every subject of the class."""
+
+	def __init__(self, klass, students, subjects, scores):
+		self.klass = klass
+		self.students = students
+		self.subjects = subjects
+		# {(student_id, subject_id): score}; pairs without a row are absent
+		self.scores = scores
+
+	def rows(self):
+		"""Yield ``(student, [(subject, score), ...])`` in display order."""
+		for student in self.students:
+			yield student, [(subject, self.scores.get((student.id, subject.id))) for subject in self.subjects]
+
+
+def build_gradebook(klass) -> Gradebook:
+	"""Load the matrix for ``klass`` with three queries, whatever its size."""
+	students = list(
+		Student.objects.filter(school_class=klass).order_by('name', 'id').only('id', 'name', 'father_name', 'school_class')
+	)
+	subjects = list(class_subjects(klass).only('id', 'name', 'semester'))
+	scores = {}
+	if students and subjects:
+		scores = {
+			(student_id, subject_id): score
+			for student_id, subject_id, score in StudentScore.objects.filter(
+				student__school_class=klass, subject__in=[s.id for s in subjects],
+			).values_list('student_id', 'subject_id', 'score')
+		}
+	return Gradebook(klass, students, subjects, scores)
@@ -0,0 +1,51 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import bundled
+
+SOURCE = os.path.join('core', 'fonts', 'B_NAZANIN', 'B-NAZANIN.TTF')
+WEB_FONT = os.path.join('static', 'fonts', 'B_NAZANIN', 'B-NAZANIN.woff2')
+
+# Persian/Arabic letters, their presentation forms (the PDF renderer draws
+# reshaped text), digits, the punctuation the font has, and the joiner and
+# direction marks; everything else, including hinting, is dropped
+UNICODES = [
+	*range(0x0020, 0x007F),
+	0x00AB, 0x00B7, 0x00BB, 0x00D7, 0x00F7,
+	*range(0x0600, 0x0700),
+	*range(0x0750, 0x0780),
+	*range(0x200C, 0x2010),
+	0x2018, 0x2019, 0x201C, 0x201D, 0x2039, 0x203A, 0x2219,
+	*range(0xFB50, 0xFE00),
+	*range(0xFE70, 0xFF00),
+]
+
+
+class Command(BaseCommand):
+	help = 'Subset the B Nazanin font to Persian glyphs: WOFF2 for the web pages, TrueType for PDFs.'
+
+	def handle(self, *args, **options):
+		try:
+			from fontTools import subset
+		except ImportError:
+			raise CommandError('fontTools is required: pip install fonttools brotli')
+
+		source = os.path.join(settings.BASE_DIR, SOURCE)
+		targets = [(bundled.path('font'), None), (os.path.join(settings.BASE_DIR, WEB_FONT), 'woff2')]
+		font_options = subset.Options()
+		font_options.layout_features = ['*']
+		font_options.hinting = False
+		font = subset.load_font(source, font_options)
+		subsetter = subset.Subsetter(font_options)
+		subsetter.populate(unicodes=UNICODES)
+		subsetter.subset(font)
+		for path, flavor in targets:
+			font_options.flavor = flavor
+			try:
+				subset.save_font(font, path, font_options)
+			except ImportError:
+				raise CommandError('Writing WOFF2 requires the brotli package.')
+			self.stdout.write(f'{os.path.relpath(path, settings.BASE_DIR)}: {os.path.getsize(path)} bytes')
+		self.stdout.write(self.style.SUCCESS(f'Subset {os.path.getsize(source)} bytes of {SOURCE}.'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core import caching, thumbnails
+from core.models import Student, Teacher
+from core.signals import with_card_bump
+
+
+class Command(BaseCommand):
+	help = 'Generate the resized WebP variants of existing student and teacher photos.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist.')
+
+	def handle(self, *args, **options):
+		written = failed = 0
+		for model in (Student, Teacher):
+			changed = []
+			photos = model.objects.exclude(image='').exclude(image__isnull=True).only('image')
+			for obj in photos.iterator():
+				try:
+					count = thumbnails.generate_variants(obj.image, force=options['force'])
+				except OSError as exc:
+					failed += 1
+					self.stderr.write(f'{model.__name__} {obj.pk}: {obj.image.name}: {exc}')
+					continue
+				if count:
+					written += count
+					changed.append(obj.pk)
+			if changed:
+				# cached list cards still point at the original photo
+				model.objects.filter(pk__in=changed).update(**with_card_bump())
+				caching.bump(model)
+		self.stdout.write(self.style.SUCCESS(f'Wrote {written} image variants ({failed} photos could not be read).'))
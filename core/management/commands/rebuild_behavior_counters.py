@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from core import caching
+from core.models import Student, Teacher, StudentBehavior, TeacherBehavior
+from core.signals import with_card_bump
+
+
+def _count_subquery(behavior_model, owner_field, entry_type):
+	counts = (
+		behavior_model.objects.filter(**{owner_field: OuterRef('pk')}, entry_type=entry_type)
+		.order_by().values(owner_field).annotate(c=Count('id')).values('c')
+	)
+	return Coalesce(Subquery(counts), Value(0))
+
+
+def _repair(model, behavior_model, owner_field) -> int:
+	"""Rewrite the counters that differ from the entries; returns the number of rows fixed.
+
+	Only those rows get a new ``card_version``, so the other cached list
+	cards stay valid.
+	"""
+	merits = _count_subquery(behavior_model, owner_field, 'merit')
+	violations = _count_subquery(behavior_model, owner_field, 'violation')
+	stale = model.objects.alias(merits=merits, violations=violations).exclude(
+		merit_count=F('merits'), violation_count=F('violations'),
+	)
+	return stale.update(**with_card_bump(merit_count=merits, violation_count=violations))
+
+
+class Command(BaseCommand):
+	help = 'Recompute the merit/violation counters of students and teachers from their behavior entries.'
+
+	def handle(self, *args, **options):
+		with transaction.atomic():
+			students = _repair(Student, StudentBehavior, 'student')
+			teachers = _repair(Teacher, TeacherBehavior, 'teacher')
+			# queryset updates send no signals; retire the cached lists once committed
+			if students or teachers:
+				caching.bump(Student, Teacher)
+		self.stdout.write(self.style.SUCCESS(f'Corrected the counters of {students} students and {teachers} teachers.'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core import search
+from core.models import Student, Teacher
+
+
+class Command(BaseCommand):
+	help = 'Rebuild the full-text search index for students and teachers.'
+
+	def handle(self, *args, **options):
+		if not search.is_available():
+			raise CommandError('Full-text search is only available on SQLite.')
+		with transaction.atomic(), connection.cursor() as cursor:
+			search.create_tables(cursor)
+			students = search.rebuild('student', Student.objects.all(), cursor)
+			teachers = search.rebuild('teacher', Teacher.objects.all(), cursor)
+		self.stdout.write(self.style.SUCCESS(f'Indexed {students} students and {teachers} teachers.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core import exams
+
+
+class Command(BaseCommand):
+	help = 'Recompute the per-semester result summaries of all students from their scores.'
+
+	def handle(self, *args, **options):
+		count = exams.rebuild_semester_results()
+		self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} semester results.'))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_student_teacher_behavior'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schoolclass',
+            index=models.Index(fields=['created_at', 'id'], name='core_class_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['created_at', 'id'], name='core_student_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['created_at', 'id'], name='core_subject_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['created_at', 'id'], name='core_teacher_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from core import search
+    Student = apps.get_model('core', 'Student')
+    Teacher = apps.get_model('core', 'Teacher')
+    with schema_editor.connection.cursor() as cursor:
+        search.create_tables(cursor)
+        search.rebuild('student', Student.objects.all(), cursor)
+        search.rebuild('teacher', Teacher.objects.all(), cursor)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from core import search
+    with schema_editor.connection.cursor() as cursor:
+        search.drop_tables(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_created_at_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, reverse_code=drop_search_index),
+    ]
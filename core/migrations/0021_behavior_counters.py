@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:45
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _count_subquery(behavior_model, owner_field, entry_type):
+    counts = (
+        behavior_model.objects.filter(**{owner_field: OuterRef('pk')}, entry_type=entry_type)
+        .order_by().values(owner_field).annotate(c=Count('id')).values('c')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def backfill_counters(apps, schema_editor):
+    for owner, behavior, owner_field in (
+        ('Student', 'StudentBehavior', 'student'),
+        ('Teacher', 'TeacherBehavior', 'teacher'),
+    ):
+        owner_model = apps.get_model('core', owner)
+        behavior_model = apps.get_model('core', behavior)
+        owner_model.objects.update(
+            merit_count=_count_subquery(behavior_model, owner_field, 'merit'),
+            violation_count=_count_subquery(behavior_model, owner_field, 'violation'),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='merit_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='تعداد امتیازات'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='violation_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='تعداد تخلفات'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='merit_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='تعداد امتیازات'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='violation_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='تعداد تخلفات'),
+        ),
+        migrations.RunPython(backfill_counters, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_behavior_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentbehavior',
+            index=models.Index(fields=['student', 'entry_type', 'created_at', 'id'], name='core_studbeh_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacherbehavior',
+            index=models.Index(fields=['teacher', 'entry_type', 'created_at', 'id'], name='core_teachbeh_history_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:47
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def backfill_effective_level(apps, schema_editor):
+    Student = apps.get_model('core', 'Student')
+    Subject = apps.get_model('core', 'Subject')
+    SchoolClass = apps.get_model('core', 'SchoolClass')
+    StudyLevel = apps.get_model('core', 'StudyLevel')
+
+    class_level = SchoolClass.objects.filter(pk=OuterRef('school_class_id')).values('level_id')[:1]
+    Student.objects.update(effective_level_id=Coalesce('level_id', Subquery(class_level)))
+
+    aali = StudyLevel.objects.filter(code='aali').first()
+    Subject.objects.filter(level__isnull=False).update(effective_level_id=models.F('level_id'))
+    Subject.objects.filter(level__isnull=True).update(effective_level=aali)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_behavior_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='effective_level',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.studylevel', verbose_name='سطح مؤثر'),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='effective_level',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.studylevel', verbose_name='سطح مؤثر'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['effective_level', 'created_at', 'id'], name='core_student_efflevel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['effective_level', 'created_at', 'id'], name='core_subject_efflevel_idx'),
+        ),
+        migrations.RunPython(backfill_effective_level, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:54
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def backfill_semester_results(apps, schema_editor):
+    # same rules as core.exams.rebuild_semester_results
+    StudentScore = apps.get_model('core', 'StudentScore')
+    SemesterResult = apps.get_model('core', 'SemesterResult')
+    positive = Q(score__gt=0)
+    rows = (
+        StudentScore.objects.order_by()
+        .values_list('student_id', 'subject__semester')
+        .annotate(total=Coalesce(Sum('score', filter=positive), 0), subjects_count=Count('id', filter=positive))
+    )
+    results = []
+    for student_id, semester, total, subjects_count in rows:
+        if subjects_count:
+            average = (Decimal(total) / subjects_count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            status = 'passed' if average >= 55 else 'failed'
+        else:
+            average, status = Decimal(0), 'unknown'
+        results.append(SemesterResult(
+            student_id=student_id, semester=semester, total=total,
+            subjects_count=subjects_count, average=average, status=status,
+        ))
+    SemesterResult.objects.bulk_create(results, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_effective_level'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SemesterResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.PositiveSmallIntegerField(choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4')], verbose_name='سمستر')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='مجموع نمرات')),
+                ('subjects_count', models.PositiveSmallIntegerField(default=0, verbose_name='تعداد مضامین')),
+                ('average', models.DecimalField(decimal_places=2, default=0, max_digits=5, verbose_name='معدل')),
+                ('status', models.CharField(choices=[('passed', 'کامیاب'), ('failed', 'مردود'), ('unknown', 'نامشخص')], default='unknown', max_length=10, verbose_name='وضعیت')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='بروزرسانی شده در')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='semester_results', to='core.student')),
+            ],
+            options={
+                'verbose_name': 'نتیجه سمستر',
+                'verbose_name_plural': 'نتایج سمستر',
+                'unique_together': {('student', 'semester')},
+            },
+        ),
+        migrations.RunPython(backfill_semester_results, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_semester_results'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='semesterresult',
+            index=models.Index(fields=['semester', 'average'], name='core_semresult_avg_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentscore',
+            index=models.Index(fields=['subject', 'score'], name='core_score_subject_idx'),
+        ),
+    ]
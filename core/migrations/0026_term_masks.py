@@ -0,0 +1,73 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+def _bit(number):
+    return 1 << (number - 1) if number and 1 <= number <= 31 else 0
+
+
+def backfill_term_masks(apps, schema_editor):
+    for model_name in ('Student', 'Teacher'):
+        Model = apps.get_model('core', model_name)
+        owner_id = f'{model_name.lower()}_id'
+        for field, number, mask_field in (
+            ('semesters', 'semester__number', 'semester_mask'),
+            ('periods', 'courseperiod__number', 'period_mask'),
+        ):
+            through = Model._meta.get_field(field).remote_field.through
+            masks = {}
+            for pk, n in through.objects.values_list(owner_id, number):
+                masks[pk] = masks.get(pk, 0) | _bit(n)
+            rows = list(Model.objects.filter(pk__in=masks).only('pk'))
+            for row in rows:
+                setattr(row, mask_field, masks[row.pk])
+            Model.objects.bulk_update(rows, [mask_field], batch_size=500)
+
+    SchoolClass = apps.get_model('core', 'SchoolClass')
+    rows = list(SchoolClass.objects.select_related('semester', 'period'))
+    for row in rows:
+        row.semester_mask = _bit(row.semester.number) if row.semester else 0
+        row.period_mask = _bit(row.period.number) if row.period else 0
+    SchoolClass.objects.bulk_update(rows, ['semester_mask', 'period_mask'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_ranking_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schoolclass',
+            name='period_mask',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='دوره (بیت\u200cماسک)'),
+        ),
+        migrations.AddField(
+            model_name='schoolclass',
+            name='semester_mask',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='سمستر (بیت\u200cماسک)'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='period_mask',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='دوره\u200cها (بیت\u200cماسک)'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='semester_mask',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='سمسترها (بیت\u200cماسک)'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='period_mask',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='دوره\u200cها (بیت\u200cماسک)'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='semester_mask',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='سمسترها (بیت\u200cماسک)'),
+        ),
+        migrations.RunPython(backfill_term_masks, reverse_code=migrations.RunPython.noop),
+    ]
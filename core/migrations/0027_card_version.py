@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_term_masks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='card_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='نسخه کارت'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='card_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='نسخه کارت'),
+        ),
+    ]
@@ -1,4 +1,24 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.lookups import GreaterThan
+
+from . import terms
+
+
+class TermQuerySet(models.QuerySet):
+	"""Semester/period filters on the ``semester_mask`` and ``period_mask`` columns."""
+
+	def has_semester(self, number):
+		return self._has_bit('semester_mask', number)
+
+	def has_period(self, number):
+		return self._has_bit('period_mask', number)
+
+	def _has_bit(self, field, number):
+		bit = terms.bit(number)
+		if not bit:
+			return self.none()
+		return self.filter(GreaterThan(F(field).bitand(bit), 0))
 
 
 class Student(models.Model):
@@ -41,14 +61,47 @@ class Student(models.Model):
 	is_grade12_graduate = models.BooleanField('فارغ صنف دوازدهم', default=False)
 	# دوره‌ها (برای ابتداییه و متوسطه)
 	periods = models.ManyToManyField('CoursePeriod', verbose_name='دوره‌ها', blank=True)
+	# سمسترها و دوره‌ها به صورت بیت‌ماسک (core.terms)؛ با سیگنال m2m_changed
+	# همگام می‌شوند تا فیلتر و نمایش بدون join انجام شود
+	semester_mask = models.PositiveIntegerField('سمسترها (بیت‌ماسک)', default=0, editable=False, db_index=True)
+	period_mask = models.PositiveIntegerField('دوره‌ها (بیت‌ماسک)', default=0, editable=False, db_index=True)
+	# شمارنده‌های امتیاز/تخلف؛ با سیگنال‌های StudentBehavior بروزرسانی می‌شوند
+	merit_count = models.PositiveIntegerField('تعداد امتیازات', default=0, editable=False)
+	violation_count = models.PositiveIntegerField('تعداد تخلفات', default=0, editable=False)
+	# سطح مؤثر: سطح خود دانش‌آموز یا در نبود آن سطح صنف؛ در save و با
+	# سیگنال SchoolClass بروزرسانی می‌شود تا فیلتر سطح از ایندکس استفاده کند
+	effective_level = models.ForeignKey('StudyLevel', verbose_name='سطح مؤثر', null=True, blank=True, on_delete=models.SET_NULL, editable=False, related_name='+')
+	# نسخه کارت لیست؛ با هر ذخیره، ثبت امتیاز/تخلف یا تغییر صنف با سیگنال
+	# یک واحد بالا می‌رود و کلید کش قطعه کارت در student_list است
+	card_version = models.PositiveIntegerField('نسخه کارت', default=0, editable=False)
+
+	objects = TermQuerySet.as_manager()
 
 	class Meta:
 		verbose_name = 'دانش‌آموز'
 		verbose_name_plural = 'دانش‌آموزان'
+		indexes = [
+			# keyset pagination walks (created_at, id); see core.pagination
+			models.Index(fields=['created_at', 'id'], name='core_student_created_idx'),
+			models.Index(fields=['effective_level', 'created_at', 'id'], name='core_student_efflevel_idx'),
+		]
 
 	def __str__(self) -> str:
 		return f"{self.name} ({self.father_name})"
 
+	def save(self, *args, **kwargs):
+		self.effective_level_id = self.compute_effective_level_id()
+		_include_effective_level(kwargs, ('level', 'school_class'))
+		_protect_counters(self, kwargs)
+		super().save(*args, **kwargs)
+
+	def compute_effective_level_id(self):
+		if self.level_id:
+			return self.level_id
+		if self.school_class_id:
+			return self.school_class.level_id
+		return None
+
 
 class SchoolClass(models.Model):
 	"""Model representing a school class (صنف)."""
@@ -59,15 +112,34 @@ class SchoolClass(models.Model):
 	semester = models.ForeignKey('Semester', verbose_name='سمستر', null=True, blank=True, on_delete=models.SET_NULL)
 	# Optional link to a CoursePeriod for ابتداییه/متوسطه
 	period = models.ForeignKey('CoursePeriod', verbose_name='دوره', null=True, blank=True, on_delete=models.SET_NULL)
+	# بیت سمستر و دوره بالا (core.terms)؛ در save محاسبه می‌شود
+	semester_mask = models.PositiveIntegerField('سمستر (بیت‌ماسک)', default=0, editable=False, db_index=True)
+	period_mask = models.PositiveIntegerField('دوره (بیت‌ماسک)', default=0, editable=False, db_index=True)
 	created_at = models.DateTimeField('ایجاد شده در', auto_now_add=True)
 
+	objects = TermQuerySet.as_manager()
+
 	class Meta:
 		verbose_name = 'صنف'
 		verbose_name_plural = 'صنوف'
+		# keyset pagination walks (created_at, id); see core.pagination
+		indexes = [models.Index(fields=['created_at', 'id'], name='core_class_created_idx')]
 
 	def __str__(self) -> str:
 		return self.name
 
+	def save(self, *args, **kwargs):
+		from . import reference
+		ref = reference.get()
+		semester = ref.semesters_by_id.get(self.semester_id) or (self.semester if self.semester_id else None)
+		period = ref.periods_by_id.get(self.period_id) or (self.period if self.period_id else None)
+		self.semester_mask = terms.bit(semester.number) if semester else 0
+		self.period_mask = terms.bit(period.number) if period else 0
+		update_fields = kwargs.get('update_fields')
+		if update_fields is not None:
+			kwargs['update_fields'] = {*update_fields, 'semester_mask', 'period_mask'}
+		super().save(*args, **kwargs)
+
 
 class Subject(models.Model):
 	"""Model representing an academic subject (مضمون)."""
@@ -82,14 +154,27 @@ class Subject(models.Model):
 	semester = models.PositiveSmallIntegerField('سمستر مربوطه', choices=SEMESTER_CHOICES, default=1)
 	period = models.ForeignKey('CoursePeriod', verbose_name='دوره', null=True, blank=True, on_delete=models.SET_NULL)
 	created_at = models.DateTimeField('ایجاد شده در', auto_now_add=True)
+	# سطح مؤثر: مضامین بدون سطح (داده‌های قدیمی) جزو دوره عالی حساب می‌شوند
+	effective_level = models.ForeignKey('StudyLevel', verbose_name='سطح مؤثر', null=True, blank=True, on_delete=models.SET_NULL, editable=False, related_name='+')
 
 	class Meta:
 		verbose_name = 'مضمون'
 		verbose_name_plural = 'مضامین'
+		indexes = [
+			# keyset pagination walks (created_at, id); see core.pagination
+			models.Index(fields=['created_at', 'id'], name='core_subject_created_idx'),
+			models.Index(fields=['effective_level', 'created_at', 'id'], name='core_subject_efflevel_idx'),
+		]
 
 	def __str__(self) -> str:
 		return f"{self.name} (سمستر {self.semester})"
 
+	def save(self, *args, **kwargs):
+		from . import reference
+		self.effective_level_id = self.level_id or reference.get().levels_by_code['aali'].id
+		_include_effective_level(kwargs, ('level',))
+		super().save(*args, **kwargs)
+
 
 class Teacher(models.Model):
 	"""Model representing a teacher (استاد)."""
@@ -134,16 +219,33 @@ class Teacher(models.Model):
 	levels = models.ManyToManyField('StudyLevel', verbose_name='سطوح تدریس', blank=True)
 	# دوره‌ها (برای ابتداییه و متوسطه)
 	periods = models.ManyToManyField('CoursePeriod', verbose_name='دوره‌ها', blank=True)
+	# سمسترها و دوره‌ها به صورت بیت‌ماسک (core.terms)، همگام با سیگنال m2m_changed
+	semester_mask = models.PositiveIntegerField('سمسترها (بیت‌ماسک)', default=0, editable=False, db_index=True)
+	period_mask = models.PositiveIntegerField('دوره‌ها (بیت‌ماسک)', default=0, editable=False, db_index=True)
+	# شمارنده‌های امتیاز/تخلف؛ با سیگنال‌های TeacherBehavior بروزرسانی می‌شوند
+	merit_count = models.PositiveIntegerField('تعداد امتیازات', default=0, editable=False)
+	violation_count = models.PositiveIntegerField('تعداد تخلفات', default=0, editable=False)
+	# نسخه کارت لیست؛ با هر ذخیره، ثبت امتیاز/تخلف یا تغییر سمسترها با سیگنال
+	# یک واحد بالا می‌رود و کلید کش قطعه کارت در teacher_list است
+	card_version = models.PositiveIntegerField('نسخه کارت', default=0, editable=False)
 
 	created_at = models.DateTimeField('ایجاد شده در', auto_now_add=True)
 
+	objects = TermQuerySet.as_manager()
+
 	class Meta:
 		verbose_name = 'استاد'
 		verbose_name_plural = 'اساتید'
+		# keyset pagination walks (created_at, id); see core.pagination
+		indexes = [models.Index(fields=['created_at', 'id'], name='core_teacher_created_idx')]
 
 	def __str__(self) -> str:
 		return f"{self.name} ({self.id_number or '—'})"
 
+	def save(self, *args, **kwargs):
+		_protect_counters(self, kwargs)
+		super().save(*args, **kwargs)
+
 
 class TeacherContract(models.Model):
 	"""Model representing a teacher contract (قرارداد استاد)."""
@@ -231,11 +333,46 @@ class StudentScore(models.Model):
 		verbose_name = 'نمره دانش‌آموز'
 		verbose_name_plural = 'نمرات دانش‌آموزان'
 		unique_together = ('student', 'subject')
+		# subject rankings order the scores of one subject (core.rankings)
+		indexes = [models.Index(fields=['subject', 'score'], name='core_score_subject_idx')]
 
 	def __str__(self) -> str:
 		return f"{self.student} — {self.subject}: {self.score if self.score is not None else '—'}"
 
 
+class SemesterResult(models.Model):
+	"""Summary of a student's scores in one semester.
+
+	Derived from StudentScore and kept up to date by ``core.exams`` (signals
+	and the bulk grade paths); ``manage.py rebuild_semester_results``
+	recomputes every row.
+	"""
+	STATUS_CHOICES = [
+		('passed', 'کامیاب'),
+		('failed', 'مردود'),
+		('unknown', 'نامشخص'),
+	]
+	student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='semester_results')
+	# شماره سمستر، مانند Subject.semester
+	semester = models.PositiveSmallIntegerField('سمستر', choices=Subject.SEMESTER_CHOICES)
+	total = models.PositiveIntegerField('مجموع نمرات', default=0)
+	# تنها نمرات بزرگتر از صفر شمرده می‌شوند، مانند پارچه امتحانات
+	subjects_count = models.PositiveSmallIntegerField('تعداد مضامین', default=0)
+	average = models.DecimalField('معدل', max_digits=5, decimal_places=2, default=0)
+	status = models.CharField('وضعیت', max_length=10, choices=STATUS_CHOICES, default='unknown')
+	updated_at = models.DateTimeField('بروزرسانی شده در', auto_now=True)
+
+	class Meta:
+		verbose_name = 'نتیجه سمستر'
+		verbose_name_plural = 'نتایج سمستر'
+		unique_together = ('student', 'semester')
+		# semester rankings order the averages of one semester (core.rankings)
+		indexes = [models.Index(fields=['semester', 'average'], name='core_semresult_avg_idx')]
+
+	def __str__(self) -> str:
+		return f"{self.student} — سمستر {self.semester}: {self.average}"
+
+
 class StudentBehavior(models.Model):
 	"""Track student violations and merits."""
 	ENTRY_CHOICES = [
@@ -250,6 +387,8 @@ class StudentBehavior(models.Model):
 	class Meta:
 		verbose_name = 'تخلف/امتیاز دانش‌آموز'
 		verbose_name_plural = 'تخلفات/امتیازات دانش‌آموزان'
+		# behavior history is paged per owner and type, newest first
+		indexes = [models.Index(fields=['student', 'entry_type', 'created_at', 'id'], name='core_studbeh_history_idx')]
 
 	def __str__(self) -> str:
 		return f"{self.student} — {self.get_entry_type_display()}"
@@ -269,10 +408,42 @@ class TeacherBehavior(models.Model):
 	class Meta:
 		verbose_name = 'تخلف/امتیاز استاد'
 		verbose_name_plural = 'تخلفات/امتیازات اساتید'
+		# behavior history is paged per owner and type, newest first
+		indexes = [models.Index(fields=['teacher', 'entry_type', 'created_at', 'id'], name='core_teachbeh_history_idx')]
 
 	def __str__(self) -> str:
 		return f"{self.teacher} — {self.get_entry_type_display()}"
 
+BEHAVIOR_COUNTER_FIELDS = ('merit_count', 'violation_count')
+TERM_MASK_FIELDS = ('semester_mask', 'period_mask')
+SIGNAL_FIELDS = BEHAVIOR_COUNTER_FIELDS + TERM_MASK_FIELDS + ('card_version',)
+
+
+def _include_effective_level(save_kwargs, sources) -> None:
+	"""Write ``effective_level`` along with a partial save of the fields it is derived from."""
+	update_fields = save_kwargs.get('update_fields')
+	if update_fields is None:
+		return
+	names = set(update_fields)
+	if any(name in names or f'{name}_id' in names for name in sources):
+		save_kwargs['update_fields'] = {*names, 'effective_level'}
+
+
+def _protect_counters(instance, save_kwargs) -> None:
+	"""Keep ``save()`` of an existing row from overwriting the behavior counters.
+
+	The counters (and the semester/period masks and the card version) are
+	changed with atomic ``F()`` updates by signals, so the in-memory values
+	of a form instance may be stale.
+	"""
+	if instance._state.adding or save_kwargs.get('update_fields') is not None or save_kwargs.get('force_insert'):
+		return
+	save_kwargs['update_fields'] = [
+		f.name for f in instance._meta.concrete_fields
+		if not f.primary_key and f.name not in SIGNAL_FIELDS
+	]
+
+
 def _to_persian(num: int) -> str:
 	"""Helper to convert an integer 1..9 to Persian numeral string."""
 	map_ = {'0': '۰', '1': '۱', '2': '۲', '3': '۳', '4': '۴', '5': '۵', '6': '۶', '7': '۷', '8': '۸', '9': '۹'}
@@ -281,16 +452,12 @@ def _to_persian(num: int) -> str:
 
 def teacher_get_persian_semesters(self) -> str:
 	"""Return teacher's semesters as space-separated Persian numerals."""
-	nums = [s.number for s in self.semesters.all().order_by('number')]
-	return ' '.join(_to_persian(n) for n in nums)
+	return terms.display(self.semester_mask)
 
 
 def student_get_semesters_display(self) -> str:
 	"""Return student's semesters as space-separated Persian numerals."""
-	nums = [s.number for s in self.semesters.all().order_by('number')]
-	if not nums:
-		return '-'
-	return ' '.join(_to_persian(n) for n in nums)
+	return terms.display(self.semester_mask, empty='-')
 
 
 # attach helper as method for convenience in templates
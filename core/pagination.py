@@ -0,0 +1,154 @@
+"""Keyset (cursor) pagination over ``(created_at, id)``.
+
+Unlike ``django.core.paginator.Paginator`` this never runs a full
+``COUNT(*)`` or an ``OFFSET`` scan: every page is a range read that starts
+right after the last row of the previous page, so deep pages cost the same
+as the first one. Pages are addressed by opaque tokens instead of numbers.
+``RankedPaginator`` offers the same page interface for ranked search hits.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def _encode(payload) -> str:
+	raw = json.dumps(payload, separators=(',', ':'))
+	return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode(token):
+	padded = token + '=' * (-len(token) % 4)
+	return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(created_at, pk, direction='n') -> str:
+	"""Encode a position in the ``(-created_at, -id)`` ordering as a token."""
+	return _encode([created_at.isoformat(), pk, direction])
+
+
+def decode_cursor(token):
+	"""Decode a token from ``encode_cursor``; returns ``None`` if it is invalid."""
+	if not token:
+		return None
+	try:
+		created_at, pk, direction = _decode(token)
+		return datetime.fromisoformat(created_at), int(pk), 'p' if direction == 'p' else 'n'
+	except (ValueError, TypeError, json.JSONDecodeError):
+		return None
+
+
+class KeysetPage:
+	"""One page of results with tokens for the neighbouring pages."""
+
+	def __init__(self, object_list, next_token, previous_token, estimated_total=None, total_is_estimate=False):
+		self.object_list = object_list
+		self.next_token = next_token
+		self.previous_token = previous_token
+		self.estimated_total = estimated_total
+		self.total_is_estimate = total_is_estimate
+
+	def __iter__(self):
+		return iter(self.object_list)
+
+	def __len__(self):
+		return len(self.object_list)
+
+	def has_next(self) -> bool:
+		return self.next_token is not None
+
+	def has_previous(self) -> bool:
+		return self.previous_token is not None
+
+	def has_other_pages(self) -> bool:
+		return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+	"""Paginate a queryset newest-first on ``(created_at, id)``.
+
+	``count_queryset`` enables the optional estimated total: it is counted
+	up to ``count_limit`` rows, so the cost stays bounded however large the
+	table grows. Pass the filtered queryset before any annotations so the
+	count does not repeat joins that only the page needs.
+	"""
+
+	def __init__(self, queryset, per_page, count_queryset=None, count_limit=1000):
+		self.queryset = queryset
+		self.per_page = int(per_page)
+		self.count_queryset = count_queryset
+		self.count_limit = count_limit
+
+	def _estimate(self):
+		if self.count_queryset is None:
+			return None, False
+		total = self.count_queryset.order_by()[:self.count_limit + 1].count()
+		if total > self.count_limit:
+			return self.count_limit, True
+		return total, False
+
+	def get_page(self, token) -> KeysetPage:
+		cursor = decode_cursor(token)
+		qs = self.queryset
+		if cursor is None:
+			rows = list(qs.order_by('-created_at', '-id')[:self.per_page + 1])
+			has_more_after, has_more_before = len(rows) > self.per_page, False
+			rows = rows[:self.per_page]
+		else:
+			created_at, pk, direction = cursor
+			if direction == 'n':
+				qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+				rows = list(qs.order_by('-created_at', '-id')[:self.per_page + 1])
+				has_more_after, has_more_before = len(rows) > self.per_page, True
+				rows = rows[:self.per_page]
+			else:
+				qs = qs.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+				rows = list(qs.order_by('created_at', 'id')[:self.per_page + 1])
+				if not rows:
+					# nothing newer is left (rows were deleted); restart from the top
+					return self.get_page(None)
+				has_more_after, has_more_before = True, len(rows) > self.per_page
+				rows = rows[:self.per_page][::-1]
+
+		next_token = previous_token = None
+		if rows and has_more_after:
+			next_token = encode_cursor(rows[-1].created_at, rows[-1].pk, 'n')
+		if rows and has_more_before:
+			previous_token = encode_cursor(rows[0].created_at, rows[0].pk, 'p')
+		estimated_total, total_is_estimate = self._estimate()
+		return KeysetPage(rows, next_token, previous_token, estimated_total, total_is_estimate)
+
+
+class RankedPaginator:
+	"""Paginate an already ranked list of primary keys (e.g. search hits).
+
+	``count_queryset`` (defaulting to ``queryset``) drops ids that the
+	current filters exclude; ``queryset`` then loads just the requested page,
+	in rank order. Tokens encode the offset into the ranked list, which is
+	cheap because the list is bounded.
+	"""
+
+	def __init__(self, queryset, ranked_ids, per_page, count_queryset=None):
+		self.queryset = queryset
+		self.ranked_ids = list(ranked_ids)
+		self.per_page = int(per_page)
+		self.count_queryset = queryset if count_queryset is None else count_queryset
+
+	def get_page(self, token) -> KeysetPage:
+		offset = 0
+		if token:
+			try:
+				offset = max(int(_decode(token)[0]), 0)
+			except (ValueError, TypeError, IndexError, json.JSONDecodeError):
+				offset = 0
+		allowed = set(self.count_queryset.filter(pk__in=self.ranked_ids).values_list('pk', flat=True))
+		ids = [pk for pk in self.ranked_ids if pk in allowed]
+		if offset >= len(ids):
+			offset = 0
+		page_ids = ids[offset:offset + self.per_page]
+		by_pk = {obj.pk: obj for obj in self.queryset.filter(pk__in=page_ids)} if page_ids else {}
+		rows = [by_pk[pk] for pk in page_ids if pk in by_pk]
+		next_token = _encode([offset + self.per_page]) if offset + self.per_page < len(ids) else None
+		previous_token = _encode([max(offset - self.per_page, 0)]) if offset > 0 else None
+		return KeysetPage(rows, next_token, previous_token, len(ids), False)
@@ -0,0 +1,405 @@
+"""Server-side PDF rendering with the bundled B Nazanin font.
+
+Documents are drawn as vector text with reportlab; Persian text is shaped
+with ``arabic_reshaper`` and put in visual order with ``python-bidi``
+before it is measured or drawn. The three libraries are optional: when one
+is missing the renderers raise ``PDFUnavailable`` and the views fall back
+to an error message.
+
+The TrueType font (the Persian subset written by ``build_font_subset``,
+shared with the web pages) is parsed and registered once per process and
+the logo is read once; reportlab embeds only the glyphs a document uses,
+so the output stays small.
+"""
+import hashlib
+import io
+import json
+import threading
+from functools import lru_cache
+
+from django.core.cache import cache
+
+from . import bundled, thumbnails
+from .dates import afghan_date
+
+FONT_NAME = 'BNazanin'
+FALLBACK_FONT = 'Helvetica'
+FONT_PATH = bundled.path('font')
+
+ORGANIZATION = 'دارالعلوم عالی الحاج سید منصور نادری'
+# the font has no glyph for an em dash, so empty values print as a hyphen
+EMPTY = '-'
+
+# bump when the layout changes so cached documents are rendered again
+RENDER_VERSION = 2
+CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+PAGE_MARGIN = 50
+
+_font_lock = threading.Lock()
+_font_registered = False
+
+
+class PDFUnavailable(Exception):
+	"""Raised when reportlab, arabic-reshaper or python-bidi is not installed."""
+
+
+def _require():
+	try:
+		import arabic_reshaper  # noqa: F401
+		import bidi  # noqa: F401
+		import reportlab  # noqa: F401
+	except ImportError as exc:
+		raise PDFUnavailable(str(exc)) from exc
+
+
+def register_font() -> str:
+	"""Parse and register the TrueType font once per process; return its name."""
+	global _font_registered
+	if not _font_registered:
+		with _font_lock:
+			if not _font_registered:
+				from reportlab.pdfbase import pdfmetrics
+				from reportlab.pdfbase.ttfonts import TTFont
+				pdfmetrics.registerFont(TTFont(FONT_NAME, FONT_PATH))
+				_font_registered = True
+	return FONT_NAME
+
+
+def _jpeg(fileobj, size, crop=False):
+	"""Downscale an image to at most ``size`` pixels and wrap it as an embeddable JPEG.
+
+	reportlab embeds JPEG data as-is and stores an image only once per
+	document however many pages draw it.
+	"""
+	from PIL import Image, ImageOps
+	from reportlab.lib.utils import ImageReader
+	with Image.open(fileobj) as image:
+		image = ImageOps.exif_transpose(image).convert('RGB')
+		if crop:
+			image = ImageOps.fit(image, (size, size))
+		else:
+			image.thumbnail((size, size))
+		buffer = io.BytesIO()
+		image.save(buffer, 'JPEG', quality=85, optimize=True)
+	buffer.seek(0)
+	return ImageReader(buffer)
+
+
+@lru_cache(maxsize=1)
+def _logo():
+	"""The logo as a reusable reportlab image, or None when the file is missing."""
+	try:
+		data = bundled.get('logo').data
+	except OSError:
+		return None
+	return _jpeg(io.BytesIO(data), 240)
+
+
+def shape(text: str) -> str:
+	"""Return ``text`` with joined Arabic-script letters in visual (drawing) order."""
+	from arabic_reshaper import reshape
+	from bidi.algorithm import get_display
+	return get_display(reshape(text))
+
+
+@lru_cache(maxsize=1)
+def _glyphs() -> frozenset:
+	"""Code points the bundled font can draw."""
+	from reportlab.pdfbase import pdfmetrics
+	return frozenset(pdfmetrics.getFont(register_font()).face.charToGlyph)
+
+
+def _runs(visual: str) -> list:
+	"""Split shaped text into ``(font, text)`` runs.
+
+	B Nazanin has no Latin letters and little ASCII punctuation, so those
+	characters (e.g. in ID numbers) fall back to a standard PDF font.
+	"""
+	glyphs = _glyphs()
+	runs = []
+	for char in visual:
+		font = FONT_NAME if char.isspace() or ord(char) in glyphs else FALLBACK_FONT
+		if runs and runs[-1][0] == font:
+			runs[-1][1] += char
+		else:
+			runs.append([font, char])
+	return runs
+
+
+def _text_width(text: str, size: float) -> float:
+	from reportlab.pdfbase.pdfmetrics import stringWidth
+	return sum(stringWidth(part, font, size) for font, part in _runs(shape(text)))
+
+
+def draw_text(canvas, x, y, text, size, align='right'):
+	"""Draw logical-order ``text`` with its right edge, centre or left edge at ``x``."""
+	from reportlab.pdfbase.pdfmetrics import stringWidth
+	runs = _runs(shape(str(text)))
+	widths = [stringWidth(part, font, size) for font, part in runs]
+	if align == 'right':
+		x -= sum(widths)
+	elif align == 'centre':
+		x -= sum(widths) / 2
+	for (font, part), width in zip(runs, widths):
+		canvas.setFont(font, size)
+		canvas.drawString(x, y, part)
+		x += width
+
+
+def wrap(text: str, size: float, width: float) -> list:
+	"""Break logical-order ``text`` into lines no wider than ``width`` points.
+
+	Lines are split on words before shaping so that bidi reordering is
+	applied per line, as a reader expects.
+	"""
+	lines = []
+	for paragraph in text.splitlines() or ['']:
+		line = ''
+		for word in paragraph.split():
+			candidate = f'{line} {word}' if line else word
+			if line and _text_width(candidate, size) > width:
+				lines.append(line)
+				line = word
+			else:
+				line = candidate
+		lines.append(line)
+	return lines
+
+
+class _Page:
+	"""Draws right-aligned RTL lines top to bottom, starting new pages as needed."""
+
+	def __init__(self, canvas, width, height):
+		self.canvas = canvas
+		self.width = width
+		self.height = height
+		self.right = width - PAGE_MARGIN
+		self.y = height - PAGE_MARGIN
+
+	def ensure(self, space):
+		if self.y - space < PAGE_MARGIN:
+			self.canvas.showPage()
+			self.y = self.height - PAGE_MARGIN
+
+	def paragraph(self, text, size=12, leading=22, space_before=0):
+		self.y -= space_before
+		for line in wrap(text, size, self.right - PAGE_MARGIN):
+			self.ensure(leading)
+			self.y -= leading
+			draw_text(self.canvas, self.right, self.y, line, size)
+
+
+def _date(value) -> str:
+	return afghan_date(value) if value else EMPTY
+
+
+def contract_text(teacher, contract, details) -> dict:
+	"""All strings printed on a teacher contract, keyed by their place on the page."""
+	def value(text):
+		text = str(text or '').strip()
+		return text if text and text != '—' else EMPTY
+
+	return {
+		'number': value(contract.contract_number),
+		'date': _date(contract.contract_date),
+		'parties': (
+			f'این قرارداد فی‌مابین {ORGANIZATION} (طرف اول) و استاد {value(teacher.name)} '
+			f'فرزند {value(teacher.father_name)} با نمبر تذکره {value(teacher.id_number)} '
+			'(طرف دوم) منعقد می‌گردد.'
+		),
+		'teaching': (
+			f'سویه تحصیلی: {value(teacher.get_education_level_display())}   '
+			f'سطوح تدریس: {value(details["teacher_levels"])}   '
+			f'مضامین: {value(details["teacher_subjects"])}'
+		),
+		'period': (
+			f'مدت قرارداد از {_date(contract.start_date)} '
+			f'الی {_date(contract.end_date)} می‌باشد.'
+		),
+		'employment': (
+			f'معاش ماهوار: {value(contract.monthly_salary)}   '
+			f'وظیفه/سمت: {value(contract.position)}   '
+			f'ساعات کاری: {value(contract.work_hours)}'
+		),
+		'terms': (contract.terms or '').strip() or details['default_terms'],
+	}
+
+
+def render_contract(text: dict) -> bytes:
+	"""Draw a contract from ``contract_text`` output onto A4 and return the PDF bytes."""
+	_require()
+	from reportlab.lib.pagesizes import A4
+	from reportlab.pdfgen.canvas import Canvas
+
+	register_font()
+	buffer = io.BytesIO()
+	width, height = A4
+	canvas = Canvas(buffer, pagesize=A4, pageCompression=1)
+	canvas.setTitle('قرارداد همکاری استاد')
+	page = _Page(canvas, width, height)
+	top = page.y
+
+	# header: logo on the right, organisation in the middle, number/date on the left
+	logo = _logo()
+	if logo is not None:
+		canvas.drawImage(logo, page.right - 64, top - 64, width=64, height=64,
+			preserveAspectRatio=True, mask='auto')
+	draw_text(canvas, width / 2, top - 24, ORGANIZATION, 18, 'centre')
+	draw_text(canvas, width / 2, top - 48, 'قرارداد همکاری استاد', 14, 'centre')
+	draw_text(canvas, PAGE_MARGIN, top - 22, f'شماره قرارداد: {text["number"]}', 11, 'left')
+	draw_text(canvas, PAGE_MARGIN, top - 42, f'تاریخ: {text["date"]}', 11, 'left')
+	canvas.setLineWidth(1.5)
+	canvas.line(PAGE_MARGIN, top - 76, page.right, top - 76)
+	page.y = top - 90
+
+	page.paragraph(text['parties'])
+	page.paragraph(text['teaching'], space_before=8)
+	page.paragraph(text['period'], space_before=8)
+	page.paragraph(text['employment'], space_before=8)
+	page.paragraph('شرایط و توضیحات:', size=13, space_before=14)
+	page.paragraph(text['terms'])
+
+	# signatures and stamp are kept together at the end
+	page.ensure(150)
+	y = page.y - 60
+	box = 170
+	canvas.setLineWidth(0.8)
+	for x, label in ((page.right - box, 'امضای استاد'), (PAGE_MARGIN, 'امضای مقام دارالعلوم')):
+		canvas.line(x, y, x + box, y)
+		draw_text(canvas, x + box / 2, y - 18, label, 12, 'centre')
+	canvas.setDash(3, 3)
+	canvas.circle(width / 2, y - 10, 38)
+	draw_text(canvas, width / 2, y - 14, 'محل مهر رسمی', 10, 'centre')
+
+	canvas.showPage()
+	canvas.save()
+	return buffer.getvalue()
+
+
+def contract_pdf(teacher, contract, details) -> bytes:
+	"""Return the contract PDF, reusing a cached copy while nothing printed has changed.
+
+	The cache key hashes the contract's ``updated_at`` together with every
+	printed string, so edits to the teacher (subjects, levels, name) also
+	produce a fresh document.
+	"""
+	text = contract_text(teacher, contract, details)
+	digest = hashlib.sha256(json.dumps(
+		[RENDER_VERSION, contract.pk, str(contract.updated_at), text],
+		ensure_ascii=False, sort_keys=True,
+	).encode('utf-8')).hexdigest()
+	key = f'contract-pdf:{digest}'
+	data = cache.get(key)
+	if data is None:
+		data = render_contract(text)
+		cache.set(key, data, CACHE_TIMEOUT)
+	return data
+
+
+# ID cards keep the proportions of the on-screen card (440x620 px)
+CARD_SIZE = (330, 465)
+CARD_ORANGE = '#E8572A'
+CARD_ADDRESS = 'چهارراهی پروژه تایمنی، جوار مسجد جامع الحاج سید منصور نادری'
+
+
+def _photo(student):
+	"""The student's photo cropped for the card, or None if missing or unreadable."""
+	if not student.image:
+		return None
+	try:
+		with thumbnails.open_variant(student.image, 'print') as fh:
+			return _jpeg(fh, 240, crop=True)
+	except (OSError, ValueError):
+		return None
+
+
+def _draw_id_card(canvas, student, issued, expires):
+	from reportlab.lib.colors import HexColor, white
+
+	width, height = CARD_SIZE
+	orange = HexColor(CARD_ORANGE)
+
+	# orange header closed by a white curve, as on the printed card
+	canvas.setFillColor(orange)
+	canvas.rect(0, height - 159, width, 159, stroke=0, fill=1)
+	canvas.setFillColor(white)
+	curve = canvas.beginPath()
+	curve.moveTo(0, height - 159)
+	curve.curveTo(110, height - 129, 220, height - 129, width, height - 159)
+	curve.lineTo(width, 0)
+	curve.lineTo(0, 0)
+	curve.close()
+	canvas.drawPath(curve, stroke=0, fill=1)
+
+	logo = _logo()
+	if logo is not None:
+		canvas.circle(279, height - 45, 21, stroke=0, fill=1)
+		canvas.drawImage(logo, 261, height - 63, width=36, height=36, preserveAspectRatio=True)
+	draw_text(canvas, width / 2, height - 47, 'دارالعلوم عالی', 18, 'centre')
+	draw_text(canvas, width / 2, height - 72, 'الحاج سید منصور نادری', 18, 'centre')
+
+	# round photo with a white border
+	cx, cy, radius = width / 2, height - 138, 54
+	canvas.circle(cx, cy, radius + 4, stroke=0, fill=1)
+	canvas.setFillColor(HexColor('#F3F4F6'))
+	canvas.circle(cx, cy, radius, stroke=0, fill=1)
+	photo = _photo(student)
+	if photo is not None:
+		canvas.saveState()
+		clip = canvas.beginPath()
+		clip.circle(cx, cy, radius)
+		canvas.clipPath(clip, stroke=0, fill=0)
+		canvas.drawImage(photo, cx - radius, cy - radius, width=2 * radius, height=2 * radius)
+		canvas.restoreState()
+
+	canvas.setFillColor(orange)
+	draw_text(canvas, width / 2, height - 230, student.name, 22, 'centre')
+
+	klass = student.school_class
+	rows = (
+		('صنف', klass.name if klass else EMPTY),
+		('نام پدر', student.father_name or EMPTY),
+		('شماره تماس', student.mobile_number or EMPTY),
+		('تاریخ صدور', issued),
+		('تاریخ انقضا', expires),
+	)
+	canvas.setFillColor(HexColor('#111827'))
+	label_x, value_x = width - 24, width - 135
+	y = height - 263
+	for label, value in rows:
+		draw_text(canvas, label_x, y, label, 13)
+		draw_text(canvas, value_x + 6, y, ':', 13)
+		draw_text(canvas, value_x, y, value, 13)
+		y -= 25
+
+	canvas.setFillColor(orange)
+	canvas.rect(0, 0, width, 34, stroke=0, fill=1)
+	canvas.setFillColor(white)
+	draw_text(canvas, width / 2, 13, CARD_ADDRESS, 11, 'centre')
+
+
+def render_id_cards(students, issued, output) -> None:
+	"""Draw one ID card page per student into ``output`` as a single PDF.
+
+	``output`` is a writable binary file. ``students`` should come with
+	``school_class`` selected; the font and the logo are embedded once for
+	the whole batch. Cards are valid for a year from ``issued``.
+	"""
+	_require()
+	from reportlab.pdfgen.canvas import Canvas
+
+	register_font()
+	try:
+		expires = issued.replace(year=issued.year + 1)
+	except ValueError:
+		# issued on 29 February
+		expires = issued.replace(year=issued.year + 1, day=28)
+	issued_text, expires_text = issued.isoformat(), expires.isoformat()
+
+	canvas = Canvas(output, pagesize=CARD_SIZE, pageCompression=1)
+	canvas.setTitle('ای دی کارت دانش‌آموزان')
+	for student in students:
+		_draw_id_card(canvas, student, issued_text, expires_text)
+		canvas.showPage()
+	canvas.save()
@@ -0,0 +1,65 @@
+"""Student rankings computed by the database with window functions.
+
+``semester_ranking`` ranks students on their semester average, read from
+the ``SemesterResult`` summaries; ``subject_ranking`` ranks them on the
+score of a single subject (served by the ``(subject, score)`` index). Both
+run as one query: the filters (semester, class, subject) are applied
+before the window, so ranks are relative to exactly that group.
+
+Every ranked row gets:
+
+* ``position``: standard competition rank (1, 2, 2, 4)
+* ``dense_rank``: rank without gaps (1, 2, 2, 3)
+* ``percentile``: share of the group scoring at or below this student, 0-100
+"""
+from django.db.models import FloatField, Window
+from django.db.models.functions import Cast, CumeDist, DenseRank, Rank
+
+from .models import SemesterResult, StudentScore
+
+
+def _ranked(queryset, value):
+	"""Annotate ``queryset`` with the ranking windows over ``value`` (higher is better)."""
+	# ordering the window by a float avoids Django wrapping a DecimalField
+	# ORDER BY in CAST(), which SQLite rejects
+	ordered = Cast(value, FloatField())
+	return queryset.annotate(
+		position=Window(Rank(), order_by=ordered.desc()),
+		dense_rank=Window(DenseRank(), order_by=ordered.desc()),
+		percentile=Window(CumeDist(), order_by=ordered.asc()),
+	).order_by('position', 'student__name', 'student_id')
+
+
+def semester_ranking(semester, school_class=None):
+	"""Rank students of one semester (optionally one class) on their average.
+
+	Students without any positive score in the semester are not ranked.
+	"""
+	results = SemesterResult.objects.filter(semester=semester, subjects_count__gt=0)
+	if school_class is not None:
+		results = results.filter(student__school_class=school_class)
+	return _ranked(results.select_related('student__school_class'), 'average')
+
+
+def subject_ranking(subject, school_class=None):
+	"""Rank the students who have a score in ``subject`` (optionally one class)."""
+	scores = StudentScore.objects.filter(subject=subject, score__isnull=False)
+	if school_class is not None:
+		scores = scores.filter(student__school_class=school_class)
+	return _ranked(scores.select_related('student__school_class'), 'score')
+
+
+def as_dict(row) -> dict:
+	"""Serialise a ranked row from either ranking for the JSON endpoint."""
+	student = row.student
+	value = row.average if isinstance(row, SemesterResult) else row.score
+	return {
+		'student_id': student.id,
+		'name': student.name,
+		'father_name': student.father_name,
+		'class_name': student.school_class.name if student.school_class else '',
+		'value': float(value),
+		'position': row.position,
+		'dense_rank': row.dense_rank,
+		'percentile': round(row.percentile * 100, 1),
+	}
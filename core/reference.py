@@ -0,0 +1,172 @@
+"""Process-wide registry of reference rows (study levels, semesters, periods).
+
+The registry is loaded once per process and shared by all threads. Views
+and forms read from it instead of querying the reference tables on every
+request. A change to one of the underlying tables drops it at once in the
+process that made the change (see ``core.signals``) and starts a new
+generation of the three models in the shared cache (see ``core.caching``);
+other workers compare their registry with those generations at most once
+every ``CHECK_INTERVAL`` seconds and reload it when they differ.
+"""
+import threading
+import time
+
+from . import caching
+from .models import StudyLevel, Semester, CoursePeriod
+
+
+LEVEL_DEFS = [
+	('aali', 'عالی'),
+	('moteseta', 'متوسطه'),
+	('ebtedai', 'ابتداییه'),
+]
+SEMESTER_NUMBERS = range(1, 5)
+PERIOD_NUMBERS = range(1, 7)
+MODELS = (StudyLevel, Semester, CoursePeriod)
+CHECK_INTERVAL = 1.0
+
+
+class ReferenceData:
+	"""Immutable snapshot of the reference tables."""
+
+	def __init__(self, levels, semesters, periods):
+		self.levels = tuple(sorted(levels, key=lambda l: l.id))
+		self.semesters = tuple(sorted(semesters, key=lambda s: s.number))
+		self.periods = tuple(sorted(periods, key=lambda p: p.number))
+		self.levels_by_code = {l.code: l for l in self.levels}
+		self.levels_by_id = {l.id: l for l in self.levels}
+		self.semesters_by_number = {s.number: s for s in self.semesters}
+		self.semesters_by_id = {s.id: s for s in self.semesters}
+		self.periods_by_number = {p.number: p for p in self.periods}
+		self.periods_by_id = {p.id: p for p in self.periods}
+
+
+# reentrant: creating a missing default row while loading fires the
+# post_save receiver that calls invalidate()
+_lock = threading.RLock()
+_snapshot = None
+# generations the snapshot was loaded under, and when they were last compared
+_generations = None
+_checked_at = 0.0
+
+
+def _load() -> ReferenceData:
+	"""Read the reference tables, creating any missing default rows."""
+	levels = {l.code: l for l in StudyLevel.objects.all()}
+	for code, name in LEVEL_DEFS:
+		obj = levels.get(code)
+		if obj is None:
+			levels[code] = StudyLevel.objects.create(code=code, name=name)
+		elif obj.name != name:
+			obj.name = name
+			obj.save(update_fields=['name'])
+
+	semesters = {s.number: s for s in Semester.objects.all()}
+	missing = [Semester(number=n) for n in SEMESTER_NUMBERS if n not in semesters]
+	if missing:
+		Semester.objects.bulk_create(missing, ignore_conflicts=True)
+		semesters = {s.number: s for s in Semester.objects.all()}
+
+	periods = {p.number: p for p in CoursePeriod.objects.all()}
+	missing = [CoursePeriod(number=n) for n in PERIOD_NUMBERS if n not in periods]
+	if missing:
+		CoursePeriod.objects.bulk_create(missing, ignore_conflicts=True)
+		periods = {p.number: p for p in CoursePeriod.objects.all()}
+
+	return ReferenceData(levels.values(), semesters.values(), periods.values())
+
+
+def get() -> ReferenceData:
+	"""Return the current snapshot, loading it on first use or after another worker changed it."""
+	global _snapshot, _generations, _checked_at
+	snapshot = _snapshot
+	if snapshot is not None and time.monotonic() - _checked_at < CHECK_INTERVAL:
+		return snapshot
+	with _lock:
+		if _snapshot is None or time.monotonic() - _checked_at >= CHECK_INTERVAL:
+			current = caching.generations(*MODELS)
+			if _snapshot is None or current != _generations:
+				_snapshot = _load()
+				_generations = current
+			_checked_at = time.monotonic()
+		snapshot = _snapshot
+	return snapshot
+
+
+def invalidate(**kwargs) -> None:
+	"""Drop the cached snapshot here and, once committed, in every other worker.
+
+	Accepts arbitrary keyword arguments so it can be connected directly to
+	model signals.
+	"""
+	global _snapshot
+	with _lock:
+		_snapshot = None
+	caching.bump(*MODELS)
+
+
+def level_map() -> dict:
+	"""Return ``{code: StudyLevel}`` for all study levels."""
+	return dict(get().levels_by_code)
+
+
+def level_by_id(level_id):
+	return get().levels_by_id.get(level_id)
+
+
+def get_semester(number: int) -> Semester:
+	"""Return the Semester with ``number``, creating it if it does not exist."""
+	sem = get().semesters_by_number.get(number)
+	if sem is None:
+		sem, _ = Semester.objects.get_or_create(number=number)
+	return sem
+
+
+def get_period(number: int) -> CoursePeriod:
+	"""Return the CoursePeriod with ``number``, creating it if it does not exist."""
+	per = get().periods_by_number.get(number)
+	if per is None:
+		per, _ = CoursePeriod.objects.get_or_create(number=number)
+	return per
+
+
+def _rows_for(model, by_number: dict, numbers) -> list:
+	"""Rows of ``model`` for ``numbers``; missing ones cost one INSERT and one ``IN`` query."""
+	numbers = {n for n in numbers if n > 0}
+	rows = [by_number[n] for n in numbers if n in by_number]
+	missing = numbers.difference(by_number)
+	if missing:
+		model.objects.bulk_create([model(number=n) for n in missing], ignore_conflicts=True)
+		rows.extend(model.objects.filter(number__in=missing))
+		# bulk_create sends no post_save
+		invalidate()
+	return rows
+
+
+def semesters_for(numbers) -> list:
+	"""The Semesters with ``numbers``, creating any that do not exist."""
+	return _rows_for(Semester, get().semesters_by_number, numbers)
+
+
+def periods_for(numbers) -> list:
+	"""The CoursePeriods with ``numbers``, creating any that do not exist."""
+	return _rows_for(CoursePeriod, get().periods_by_number, numbers)
+
+
+def period_by_id(period_id):
+	return get().periods_by_id.get(period_id)
+
+
+def semester_choices() -> list:
+	"""Semesters as ``{'value', 'label'}`` dicts for the tag pickers."""
+	return [{'value': str(s.number), 'label': str(s)} for s in get().semesters]
+
+
+def period_choices(value: str = 'id') -> list:
+	"""Periods as ``{'value', 'label'}`` dicts; ``value`` is ``'id'`` or ``'number'``."""
+	return [{'value': str(getattr(p, value)), 'label': str(p)} for p in get().periods]
+
+
+def level_choices() -> list:
+	"""Levels as ``{'value', 'label'}`` dicts keyed by level code."""
+	return [{'value': l.code, 'label': l.name} for l in get().levels]
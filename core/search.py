@@ -0,0 +1,125 @@
+"""Persian-aware full-text search for students and teachers.
+
+On SQLite each model gets an FTS5 table (``core_student_fts``,
+``core_teacher_fts``) whose rowid is the model's primary key. Text is
+normalised before it is indexed and before it is queried, so Arabic and
+Persian ye/kaf, ZWNJ and Persian/Arabic-Indic digits all match each other.
+The tables are kept in sync by ``core.signals`` and can be rebuilt with
+``manage.py rebuild_search_index``. Other database backends fall back to
+``icontains`` filtering in the views.
+"""
+import re
+
+from django.db import connection
+
+
+INDEXES = {
+	'student': ('core_student_fts', ('name', 'father_name', 'mobile_number', 'id_number')),
+	'teacher': ('core_teacher_fts', ('name', 'father_name', 'id_number')),
+}
+
+# how many ranked matches a single search returns at most
+MAX_RESULTS = 1000
+
+_CHAR_MAP = str.maketrans({
+	'\u064a': '\u06cc', '\u0649': '\u06cc', '\u0626': '\u06cc',  # Arabic ye forms -> Persian ye
+	'\u0643': '\u06a9',  # Arabic kaf -> Persian keheh
+	'\u0629': '\u0647', '\u06c0': '\u0647',  # teh marbuta / heh with yeh -> heh
+	'\u0623': '\u0627', '\u0625': '\u0627', '\u0671': '\u0627',  # hamza/wasla alef -> alef
+	'\u200c': None, '\u200d': None, '\u0640': None,  # ZWNJ, ZWJ, tatweel
+	**{chr(0x06F0 + i): str(i) for i in range(10)},  # Persian digits
+	**{chr(0x0660 + i): str(i) for i in range(10)},  # Arabic-Indic digits
+})
+_DIACRITICS = re.compile('[\u064b-\u065f\u0670]')
+_TOKEN = re.compile(r'\w+')
+
+
+def normalize(text) -> str:
+	"""Fold spelling variants so that indexed text and queries compare equal."""
+	if not text:
+		return ''
+	text = _DIACRITICS.sub('', str(text).translate(_CHAR_MAP))
+	return ' '.join(_TOKEN.findall(text.lower()))
+
+
+def is_available() -> bool:
+	return connection.vendor == 'sqlite'
+
+
+def create_tables(cursor) -> None:
+	for table, columns in INDEXES.values():
+		cursor.execute(
+			f'CREATE VIRTUAL TABLE IF NOT EXISTS "{table}" '
+			f'USING fts5({", ".join(columns)}, tokenize="unicode61 remove_diacritics 2")'
+		)
+
+
+def drop_tables(cursor) -> None:
+	for table, _ in INDEXES.values():
+		cursor.execute(f'DROP TABLE IF EXISTS "{table}"')
+
+
+def _row(kind, obj) -> list:
+	_, columns = INDEXES[kind]
+	return [obj.pk] + [normalize(getattr(obj, col)) for col in columns]
+
+
+def index_object(kind, obj) -> None:
+	"""Insert or replace the index row for ``obj``."""
+	if not is_available():
+		return
+	table, columns = INDEXES[kind]
+	placeholders = ', '.join(['%s'] * (len(columns) + 1))
+	with connection.cursor() as cursor:
+		cursor.execute(f'DELETE FROM "{table}" WHERE rowid = %s', [obj.pk])
+		cursor.execute(f'INSERT INTO "{table}" (rowid, {", ".join(columns)}) VALUES ({placeholders})', _row(kind, obj))
+
+
+def remove_object(kind, pk) -> None:
+	if not is_available():
+		return
+	table, _ = INDEXES[kind]
+	with connection.cursor() as cursor:
+		cursor.execute(f'DELETE FROM "{table}" WHERE rowid = %s', [pk])
+
+
+def rebuild(kind, queryset, cursor=None) -> int:
+	"""Replace the whole index for ``kind`` with rows from ``queryset``."""
+	table, columns = INDEXES[kind]
+	placeholders = ', '.join(['%s'] * (len(columns) + 1))
+	rows = [_row(kind, obj) for obj in queryset.only('pk', *columns).iterator()]
+	own_cursor = cursor is None
+	if own_cursor:
+		cursor = connection.cursor()
+	try:
+		cursor.execute(f'DELETE FROM "{table}"')
+		cursor.executemany(f'INSERT INTO "{table}" (rowid, {", ".join(columns)}) VALUES ({placeholders})', rows)
+	finally:
+		if own_cursor:
+			cursor.close()
+	return len(rows)
+
+
+def match_expression(query: str) -> str:
+	"""Turn free text into an FTS5 query: every token must match as a prefix."""
+	return ' '.join(f'"{token}"*' for token in normalize(query).split())
+
+
+def search_ids(kind, query, limit=MAX_RESULTS):
+	"""Return primary keys matching ``query``, best match first.
+
+	Returns ``None`` when full-text search is not available on this
+	backend so callers can fall back to a plain ``icontains`` filter.
+	"""
+	if not is_available():
+		return None
+	expression = match_expression(query)
+	if not expression:
+		return []
+	table, _ = INDEXES[kind]
+	with connection.cursor() as cursor:
+		cursor.execute(
+			f'SELECT rowid FROM "{table}" WHERE "{table}" MATCH %s ORDER BY rank LIMIT %s',
+			[expression, limit],
+		)
+		return [row[0] for row in cursor.fetchall()]
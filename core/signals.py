@@ -0,0 +1,229 @@
+"""Model signal handlers that keep derived data in sync."""
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_save, post_delete, post_migrate, pre_delete
+from django.dispatch import receiver
+
+from . import caching, exams, reference, search, terms, thumbnails
+from .models import StudyLevel, Semester, CoursePeriod, Student, Teacher, SchoolClass, Subject
+from .models import StudentBehavior, TeacherBehavior, StudentScore, SemesterResult
+
+
+for _model in (StudyLevel, Semester, CoursePeriod):
+	post_save.connect(reference.invalidate, sender=_model, dispatch_uid=f'reference_save_{_model.__name__}')
+	post_delete.connect(reference.invalidate, sender=_model, dispatch_uid=f'reference_delete_{_model.__name__}')
+
+# cache generations (see core.caching); the reference models are covered by
+# reference.invalidate and SemesterResult, written only in bulk, by core.exams
+for _model in (Student, Teacher, Subject, SchoolClass, StudentScore, StudentBehavior, TeacherBehavior):
+	post_save.connect(caching.bump_sender, sender=_model, dispatch_uid=f'generation_save_{_model.__name__}')
+	post_delete.connect(caching.bump_sender, sender=_model, dispatch_uid=f'generation_delete_{_model.__name__}')
+
+for _model in (Student, Teacher):
+	for _field in _model._meta.many_to_many:
+		m2m_changed.connect(
+			caching.bump_m2m, sender=_field.remote_field.through,
+			dispatch_uid=f'generation_m2m_{_model.__name__}_{_field.name}',
+		)
+
+
+@receiver(post_migrate, dispatch_uid='reference_post_migrate')
+def warm_reference_data(sender, app_config=None, **kwargs):
+	"""Reload the registry (and create default rows) after ``migrate``."""
+	if app_config is None or app_config.label != 'core':
+		return
+	reference.invalidate()
+	reference.get()
+
+
+@receiver(post_save, sender=Student, dispatch_uid='search_index_student')
+def index_student(sender, instance, raw=False, **kwargs):
+	if not raw:
+		search.index_object('student', instance)
+
+
+@receiver(post_delete, sender=Student, dispatch_uid='search_remove_student')
+def unindex_student(sender, instance, **kwargs):
+	search.remove_object('student', instance.pk)
+
+
+@receiver(post_save, sender=Teacher, dispatch_uid='search_index_teacher')
+def index_teacher(sender, instance, raw=False, **kwargs):
+	if not raw:
+		search.index_object('teacher', instance)
+
+
+@receiver(post_delete, sender=Teacher, dispatch_uid='search_remove_teacher')
+def unindex_teacher(sender, instance, **kwargs):
+	search.remove_object('teacher', instance.pk)
+
+
+def with_card_bump(**updates) -> dict:
+	"""``updates`` plus a bump of ``card_version``, the key of the list-page card fragments."""
+	return {**updates, 'card_version': F('card_version') + 1}
+
+
+@receiver(post_save, sender=Student, dispatch_uid='card_version_student')
+@receiver(post_save, sender=Teacher, dispatch_uid='card_version_teacher')
+def bump_card_version(sender, instance, created, raw=False, **kwargs):
+	"""An edited student or teacher gets a new card fragment on the list page."""
+	if not created and not raw:
+		sender.objects.filter(pk=instance.pk).update(**with_card_bump())
+
+
+@receiver(post_save, sender=SchoolClass, dispatch_uid='card_version_class_save')
+@receiver(pre_delete, sender=SchoolClass, dispatch_uid='card_version_class_delete')
+def bump_class_card_versions(sender, instance, raw=False, **kwargs):
+	"""Student cards show the class name."""
+	if not raw:
+		Student.objects.filter(school_class=instance).update(**with_card_bump())
+
+
+def _bump_behavior_counter(model, pk, entry_type, delta) -> None:
+	"""Atomically add ``delta`` to the owner's merit/violation counter."""
+	field = f'{entry_type}_count'
+	qs = model.objects.filter(pk=pk)
+	if delta < 0:
+		qs = qs.filter(**{f'{field}__gt': 0})
+	qs.update(**with_card_bump(**{field: F(field) + delta}))
+
+
+@receiver(post_save, sender=StudentBehavior, dispatch_uid='behavior_count_student_add')
+def count_student_behavior(sender, instance, created, raw=False, **kwargs):
+	if created and not raw:
+		_bump_behavior_counter(Student, instance.student_id, instance.entry_type, 1)
+
+
+@receiver(post_delete, sender=StudentBehavior, dispatch_uid='behavior_count_student_delete')
+def uncount_student_behavior(sender, instance, **kwargs):
+	_bump_behavior_counter(Student, instance.student_id, instance.entry_type, -1)
+
+
+@receiver(post_save, sender=TeacherBehavior, dispatch_uid='behavior_count_teacher_add')
+def count_teacher_behavior(sender, instance, created, raw=False, **kwargs):
+	if created and not raw:
+		_bump_behavior_counter(Teacher, instance.teacher_id, instance.entry_type, 1)
+
+
+@receiver(post_delete, sender=TeacherBehavior, dispatch_uid='behavior_count_teacher_delete')
+def uncount_teacher_behavior(sender, instance, **kwargs):
+	_bump_behavior_counter(Teacher, instance.teacher_id, instance.entry_type, -1)
+
+
+@receiver(post_save, sender=SchoolClass, dispatch_uid='effective_level_class_save')
+def sync_class_effective_level(sender, instance, raw=False, **kwargs):
+	"""Students without their own level follow their class's level."""
+	if raw:
+		return
+	(Student.objects.filter(school_class=instance, level__isnull=True)
+		.exclude(effective_level_id=instance.level_id)
+		.update(effective_level_id=instance.level_id))
+
+
+@receiver(post_delete, sender=SchoolClass, dispatch_uid='effective_level_class_delete')
+def clear_class_effective_level(sender, instance, **kwargs):
+	# school_class has already been set to NULL on the class's students
+	(Student.objects.filter(school_class__isnull=True, level__isnull=True, effective_level__isnull=False)
+		.update(effective_level=None))
+
+
+@receiver(post_save, sender=StudentScore, dispatch_uid='semester_result_score_save')
+@receiver(post_delete, sender=StudentScore, dispatch_uid='semester_result_score_delete')
+def refresh_score_semester_result(sender, instance, raw=False, **kwargs):
+	if not raw:
+		exams.refresh_semester_results(exams.semester_pairs([(instance.student_id, instance.subject_id)]))
+
+
+@receiver(post_save, sender=Subject, dispatch_uid='semester_result_subject_save')
+def refresh_subject_semester_results(sender, instance, created, raw=False, **kwargs):
+	"""A subject moved to another semester changes both semesters' summaries."""
+	if created or raw:
+		return
+	student_ids = set(StudentScore.objects.filter(subject=instance).values_list('student_id', flat=True))
+	if not student_ids:
+		return
+	pairs = {(student_id, instance.semester) for student_id in student_ids}
+	pairs.update(SemesterResult.objects.filter(student_id__in=student_ids).values_list('student_id', 'semester'))
+	exams.refresh_semester_results(pairs)
+
+
+@receiver(post_save, sender=Student, dispatch_uid='image_variants_student')
+@receiver(post_save, sender=Teacher, dispatch_uid='image_variants_teacher')
+def build_image_variants(sender, instance, raw=False, update_fields=None, **kwargs):
+	"""Write the resized variants of a newly uploaded photo."""
+	if raw or not instance.image or (update_fields is not None and 'image' not in update_fields):
+		return
+	try:
+		thumbnails.generate_variants(instance.image)
+	except OSError:
+		# an unreadable upload keeps being served as is; the
+		# build_image_variants command reports such files
+		pass
+
+
+# through model: (owner model, M2M field, mask column); see core.terms
+TERM_MASKS = {
+	Student.semesters.through: (Student, 'semesters', 'semester_mask'),
+	Student.periods.through: (Student, 'periods', 'period_mask'),
+	Teacher.semesters.through: (Teacher, 'semesters', 'semester_mask'),
+	Teacher.periods.through: (Teacher, 'periods', 'period_mask'),
+}
+
+
+def _term_numbers(model, pks) -> list:
+	"""Numbers of the Semester/CoursePeriod rows ``pks``, from the registry where possible."""
+	ref = reference.get()
+	by_id = ref.semesters_by_id if model is Semester else ref.periods_by_id
+	numbers = [by_id[pk].number for pk in pks if pk in by_id]
+	missing = [pk for pk in pks if pk not in by_id]
+	if missing:
+		numbers += model.objects.filter(pk__in=missing).values_list('number', flat=True)
+	return numbers
+
+
+def sync_term_mask(sender, instance, action, reverse, model, pk_set, **kwargs):
+	"""Mirror add/remove/clear on a semester or period M2M into the mask column."""
+	owner, field, mask_field = TERM_MASKS[sender]
+	if reverse:
+		# instance is a Semester/CoursePeriod; pk_set holds students or teachers
+		bits = terms.bit(instance.number)
+		if action in ('post_add', 'post_remove'):
+			rows = owner.objects.filter(pk__in=pk_set)
+		elif action == 'pre_clear':
+			rows = owner.objects.filter(**{field: instance})
+		else:
+			return
+		if action == 'post_add':
+			rows.update(**with_card_bump(**{mask_field: F(mask_field).bitor(bits)}))
+		else:
+			rows.update(**with_card_bump(**{mask_field: F(mask_field).bitand(~bits)}))
+		return
+
+	rows = owner.objects.filter(pk=instance.pk)
+	mask = getattr(instance, mask_field)
+	if action == 'post_clear':
+		rows.update(**with_card_bump(**{mask_field: 0}))
+		mask = 0
+	elif action in ('post_add', 'post_remove'):
+		bits = terms.to_mask(_term_numbers(model, pk_set))
+		if action == 'post_add':
+			rows.update(**with_card_bump(**{mask_field: F(mask_field).bitor(bits)}))
+			mask |= bits
+		else:
+			rows.update(**with_card_bump(**{mask_field: F(mask_field).bitand(~bits)}))
+			mask &= ~bits
+	setattr(instance, mask_field, mask)
+
+
+for _through, (_owner, _field, _mask) in TERM_MASKS.items():
+	m2m_changed.connect(sync_term_mask, sender=_through, dispatch_uid=f'term_mask_{_owner.__name__}_{_field}')
+
+
+@receiver(pre_delete, sender=Semester, dispatch_uid='term_mask_semester_delete')
+@receiver(pre_delete, sender=CoursePeriod, dispatch_uid='term_mask_period_delete')
+def clear_term_bit(sender, instance, **kwargs):
+	"""Deleting a semester or period removes its M2M rows without m2m_changed."""
+	mask_field, fk = ('semester_mask', 'semester') if sender is Semester else ('period_mask', 'period')
+	bits = ~terms.bit(instance.number)
+	for owner, field in ((Student, f'{fk}s'), (Teacher, f'{fk}s')):
+		owner.objects.filter(**{field: instance}).update(**with_card_bump(**{mask_field: F(mask_field).bitand(bits)}))
+	SchoolClass.objects.filter(**{fk: instance}).update(**{mask_field: F(mask_field).bitand(bits)})
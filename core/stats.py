@@ -0,0 +1,116 @@
+"""Cached dashboard figures.
+
+All dashboard numbers come from a single SQL statement: one grouped pass
+over students (by effective level and gender) plus the row counts of the
+teacher, subject and class tables. The result is stored in the shared
+cache under the generations of those four models (see ``core.caching``),
+so a write in any worker retires it. Concurrent cache misses are
+coalesced so that only one request recomputes the snapshot.
+"""
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import connection
+
+from . import caching
+from .models import Student, Teacher, Subject, SchoolClass
+
+
+# a snapshot computed while a write happens is stored under the old
+# generations and never read
+MODELS = (Student, Teacher, Subject, SchoolClass)
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 5
+
+_compute_lock = threading.Lock()
+
+
+def compute_snapshot() -> dict:
+	"""Compute every dashboard figure with one database round-trip."""
+	qn = connection.ops.quote_name
+	sql = (
+		f'SELECT %s, {qn("effective_level_id")}, {qn("gender")}, COUNT(*) '
+		f'FROM {qn(Student._meta.db_table)} GROUP BY {qn("effective_level_id")}, {qn("gender")} '
+		f'UNION ALL SELECT %s, NULL, NULL, COUNT(*) FROM {qn(Teacher._meta.db_table)} '
+		f'UNION ALL SELECT %s, NULL, NULL, COUNT(*) FROM {qn(Subject._meta.db_table)} '
+		f'UNION ALL SELECT %s, NULL, NULL, COUNT(*) FROM {qn(SchoolClass._meta.db_table)}'
+	)
+	snapshot = {
+		'students': 0,
+		'teachers': 0,
+		'subjects': 0,
+		'classes': 0,
+		'gender': {'male': 0, 'female': 0},
+		'levels': {},
+	}
+	with connection.cursor() as cursor:
+		cursor.execute(sql, ['students', 'teachers', 'subjects', 'classes'])
+		for kind, level_id, gender, count in cursor.fetchall():
+			if kind != 'students':
+				snapshot[kind] = count
+				continue
+			snapshot['students'] += count
+			if gender in snapshot['gender']:
+				snapshot['gender'][gender] += count
+			if level_id is not None:
+				snapshot['levels'][level_id] = snapshot['levels'].get(level_id, 0) + count
+	return snapshot
+
+
+def _acquire(lock_key):
+	"""Take the cross-worker lock; returns its token, or ``None`` if another worker holds it.
+
+	``cache.add`` is not atomic on every backend (the file cache checks,
+	then writes), so the token is read back: of two workers that both
+	added it, only the one whose token stuck owns the lock.
+	"""
+	token = uuid.uuid4().hex
+	if cache.add(lock_key, token, LOCK_TIMEOUT) and cache.get(lock_key) == token:
+		return token
+	return None
+
+
+def _release(lock_key, token) -> None:
+	"""Drop the lock unless it expired and another worker has taken it since."""
+	if cache.get(lock_key) == token:
+		cache.delete(lock_key)
+
+
+def get_snapshot() -> dict:
+	"""Return the cached snapshot, recomputing it at most once per miss.
+
+	Threads of one process wait on a lock while one of them computes; when
+	another process holds the lock key in the shared cache, this one polls
+	briefly for its result (without blocking its own threads) and only then
+	runs the aggregation itself.
+	"""
+	key = caching.make_key('dashboard:snapshot', MODELS)
+	lock_key = f'{key}:lock'
+	snapshot = cache.get(key)
+	if snapshot is not None:
+		return snapshot
+	with _compute_lock:
+		snapshot = cache.get(key)
+		if snapshot is not None:
+			return snapshot
+		token = _acquire(lock_key)
+		if token is not None:
+			try:
+				snapshot = compute_snapshot()
+				cache.set(key, snapshot, caching.CACHE_TIMEOUT)
+			finally:
+				_release(lock_key, token)
+			return snapshot
+
+	deadline = time.monotonic() + LOCK_WAIT
+	while time.monotonic() < deadline:
+		time.sleep(0.05)
+		snapshot = cache.get(key)
+		if snapshot is not None:
+			return snapshot
+	# the other worker is slow or gone; its lock is left for it to release
+	snapshot = compute_snapshot()
+	cache.set(key, snapshot, caching.CACHE_TIMEOUT)
+	return snapshot
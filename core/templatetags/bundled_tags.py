@@ -0,0 +1,14 @@
+from django import template
+
+from core import bundled
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundled_url(name):
+    """Versioned URL of a file served from memory by ``core.bundled``.
+
+    Usage in template: {% bundled_url 'logo' %}
+    """
+    return bundled.url(name)
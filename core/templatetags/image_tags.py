@@ -0,0 +1,14 @@
+from django import template
+
+from core import thumbnails
+
+register = template.Library()
+
+
+@register.filter(name='variant')
+def variant(image, name):
+    """URL of a resized photo variant, falling back to the original.
+
+    Usage in template: {{ student.image|variant:'avatar' }}
+    """
+    return thumbnails.variant_url(image, name)
@@ -0,0 +1,37 @@
+"""Bitmask encoding of semester and period numbers.
+
+Students, teachers and classes also keep their semesters and periods in
+two integer columns, ``semester_mask`` and ``period_mask``: bit ``n - 1``
+is set for number ``n``. ``core.signals`` keeps them in step with the M2M
+relations (and a class's foreign keys), so filters are a predicate on one
+column and displays need no query. Numbers above ``MAX_NUMBER`` get no bit.
+"""
+from .dates import to_persian_digits
+
+# the masks are PositiveIntegerFields (31 usable bits)
+MAX_NUMBER = 31
+
+
+def bit(number) -> int:
+	"""The bit for semester or period ``number``; 0 when it has none."""
+	if number is None or not 1 <= number <= MAX_NUMBER:
+		return 0
+	return 1 << (number - 1)
+
+
+def to_mask(numbers) -> int:
+	"""The mask holding ``numbers``."""
+	mask = 0
+	for number in numbers:
+		mask |= bit(number)
+	return mask
+
+
+def to_numbers(mask) -> list:
+	"""The numbers set in ``mask``, in ascending order."""
+	return [n for n in range(1, MAX_NUMBER + 1) if mask & (1 << (n - 1))]
+
+
+def display(mask, empty: str = '') -> str:
+	"""The numbers in ``mask`` as space-separated Persian numerals."""
+	return ' '.join(to_persian_digits(n) for n in to_numbers(mask)) or empty
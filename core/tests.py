@@ -1,3 +1,58 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from . import thumbnails
+from .models import Student
+
+
+def _photo(name, color, fmt):
+	buffer = io.BytesIO()
+	Image.new('RGB', (300, 300), color).save(buffer, fmt)
+	return SimpleUploadedFile(name, buffer.getvalue())
+
+
+# keep the tests out of the shared file cache
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ImageVariantTests(TestCase):
+
+	def setUp(self):
+		self.media_root = tempfile.mkdtemp()
+		media = override_settings(MEDIA_ROOT=self.media_root)
+		media.enable()
+		self.addCleanup(media.disable)
+		self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+	def test_same_stem_different_extension_keep_their_own_variants(self):
+		red = Student.objects.create(name='الف', image=_photo('photo.jpg', (255, 0, 0), 'JPEG'))
+		blue = Student.objects.create(name='ب', image=_photo('photo.png', (0, 0, 255), 'PNG'))
+
+		red_url = thumbnails.variant_url(red.image, 'avatar')
+		blue_url = thumbnails.variant_url(blue.image, 'avatar')
+		self.assertNotEqual(red_url, blue_url)
+		self.assertTrue(blue_url.endswith('.webp'))
+
+		with thumbnails.open_variant(blue.image, 'avatar') as fh, Image.open(fh) as avatar:
+			r, g, b = avatar.convert('RGB').getpixel((0, 0))
+		self.assertGreater(b, 200)
+		self.assertLess(r, 50)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class EffectiveLevelTests(TestCase):
+
+	def test_partial_save_of_level_writes_effective_level(self):
+		from . import reference
+		levels = reference.get().levels_by_code
+		student = Student.objects.create(name='ج', level=levels['aali'])
+		student.level = levels['ebtedai']
+		student.save(update_fields=['level'])
+		student.refresh_from_db()
+		self.assertEqual(student.effective_level_id, levels['ebtedai'].id)
@@ -0,0 +1,84 @@
+"""Resized WebP variants of uploaded student and teacher photos.
+
+Every photo gets the variants in ``VARIANTS``, stored next to the original
+(``students/ali.jpg`` -> ``students/ali.jpg.avatar.webp``). They are written
+when a photo is saved and can be backfilled with the
+``build_image_variants`` command; until a variant exists, ``variant_url``
+falls back to the original file.
+"""
+import io
+
+from django.core.files.base import ContentFile
+
+VARIANTS = {
+	# name: (longest side in pixels, crop to a square)
+	'avatar': (128, True),
+	'card': (480, True),
+	'print': (1200, False),
+}
+WEBP_QUALITY = 80
+
+
+def variant_name(name: str, variant: str) -> str:
+	"""Storage name of ``variant`` for the file stored as ``name``.
+
+	The original extension is kept, so ``ali.jpg`` and ``ali.png`` do not
+	share variants.
+	"""
+	return f'{name}.{variant}.webp'
+
+
+def variant_url(fieldfile, variant: str) -> str:
+	"""URL of a photo variant, or of the original while the variant is missing."""
+	if not fieldfile:
+		return ''
+	name = variant_name(fieldfile.name, variant)
+	if fieldfile.storage.exists(name):
+		return fieldfile.storage.url(name)
+	return fieldfile.url
+
+
+def open_variant(fieldfile, variant: str):
+	"""Open a variant for reading, falling back to the original file."""
+	name = variant_name(fieldfile.name, variant)
+	if fieldfile.storage.exists(name):
+		return fieldfile.storage.open(name, 'rb')
+	return fieldfile.open('rb')
+
+
+def generate_variants(fieldfile, force=False) -> int:
+	"""Write the missing variants of ``fieldfile`` (all of them with ``force``).
+
+	Returns how many were written. Raises ``OSError`` when the original is
+	missing or is not an image Pillow can read.
+	"""
+	from PIL import Image, ImageOps
+
+	if not fieldfile:
+		return 0
+	storage = fieldfile.storage
+	pending = [
+		(variant, spec) for variant, spec in VARIANTS.items()
+		if force or not storage.exists(variant_name(fieldfile.name, variant))
+	]
+	if not pending:
+		return 0
+	with fieldfile.open('rb') as fh, Image.open(fh) as original:
+		original = ImageOps.exif_transpose(original)
+		if original.mode not in ('RGB', 'RGBA'):
+			original = original.convert('RGB')
+		for variant, (size, crop) in pending:
+			if crop:
+				# never upscale small photos
+				side = min(size, *original.size)
+				image = ImageOps.fit(original, (side, side))
+			else:
+				image = original.copy()
+				image.thumbnail((size, size))
+			buffer = io.BytesIO()
+			image.save(buffer, 'WEBP', quality=WEBP_QUALITY)
+			name = variant_name(fieldfile.name, variant)
+			if storage.exists(name):
+				storage.delete(name)
+			storage.save(name, ContentFile(buffer.getvalue()))
+	return len(pending)
@@ -1,89 +1,47 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
-from django.core.paginator import Paginator
-from django.db.models import Q, Count, Prefetch
+from django.db.models import Q
 from django.contrib import messages
-from django.http import FileResponse, Http404, JsonResponse
-from django.conf import settings
-import os
-from .models import Student, SchoolClass, Subject, Teacher, StudyLevel, CoursePeriod, Semester, TeacherContract
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from .models import Student, SchoolClass, Subject, Teacher, TeacherContract
 from .models import StudentBehavior, TeacherBehavior
 from .forms import StudentForm, SchoolClassForm, SubjectForm, TeacherForm, TeacherContractForm
-from .models import StudentScore
+from .models import StudentScore, SemesterResult
+from . import reference
+from .pagination import KeysetPaginator, RankedPaginator
+from . import assignments, bundled, caching, dates, exams, exports, grading, pdf, rankings, search, stats, terms
 import json
+import tempfile
 from django.utils.safestring import mark_safe
 from django.utils import timezone
 
 
-def _persian_to_ascii(s: str) -> str:
-	"""Convert Persian digits to ASCII digits."""
-	mapping = {
-		'۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4',
-		'۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9',
-	}
-	return ''.join(mapping.get(ch, ch) for ch in s)
-
+# rows shown on the rankings page; the JSON endpoint takes its own limit
+RANKING_PAGE_LIMIT = 200
 
-def _gregorian_to_jalali(gy: int, gm: int, gd: int):
-	"""Convert Gregorian date to Jalali (Shamsi). Returns (jy, jm, jd)."""
-	g_d_m = [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334]
-	if gy > 1600:
-		jy = 979
-		gy -= 1600
-	else:
-		jy = 0
-		gy -= 621
-	gy2 = gy + 1 if gm > 2 else gy
-	days = (
-		365 * gy
-		+ (gy2 + 3) // 4
-		- (gy2 + 99) // 100
-		+ (gy2 + 399) // 400
-		- 80
-		+ gd
-		+ g_d_m[gm - 1]
-	)
-	jy += 33 * (days // 12053)
-	days %= 12053
-	jy += 4 * (days // 1461)
-	days %= 1461
-	if days > 365:
-		jy += (days - 1) // 365
-		days = (days - 1) % 365
-	if days < 186:
-		jm = 1 + days // 31
-		jd = 1 + days % 31
-	else:
-		jm = 7 + (days - 186) // 30
-		jd = 1 + (days - 186) % 30
-	return jy, jm, jd
+# models whose generations key the cached list pages and API responses
+# (see core.caching); the behavior models are there for the card counters
+STUDENT_LIST_MODELS = (Student, StudentBehavior, SchoolClass, *reference.MODELS)
+TEACHER_LIST_MODELS = (Teacher, TeacherBehavior, *reference.MODELS)
+SUBJECT_LIST_MODELS = (Subject, *reference.MODELS)
+CLASS_LIST_MODELS = (SchoolClass, *reference.MODELS)
+RANKING_MODELS = (SemesterResult, StudentScore, Student, SchoolClass, Subject)
 
+# ID card PDFs larger than this are spooled to disk while they stream
+ID_CARDS_SPOOL_SIZE = 2 * 1024 * 1024
 
-def _ensure_reference_data():
-	"""Ensure study levels, semesters, and periods exist."""
-	level_defs = [
-		('aali', 'عالی'),
-		('moteseta', 'متوسطه'),
-		('ebtedai', 'ابتداییه'),
-	]
-	level_map = {}
-	for code, name in level_defs:
-		obj, _ = StudyLevel.objects.get_or_create(code=code, defaults={'name': name})
-		if obj.name != name:
-			obj.name = name
-			obj.save(update_fields=['name'])
-		level_map[code] = obj
+# merits needed before an appreciation certificate can be printed
+APPRECIATION_MIN_MERITS = 3
 
-	for n in range(1, 5):
-		Semester.objects.get_or_create(number=n)
-	for n in range(1, 7):
-		CoursePeriod.objects.get_or_create(number=n)
-
-	return level_map
+DEFAULT_CONTRACT_TERMS = (
+	'استاد متعهد می‌گردد مطابق نظم داخلی دارالعلوم، '
+	'اوقات رسمی و برنامه درسی را رعایت نموده و در صورت ضرورت '
+	'در جلسات علمی و اداری اشتراک نماید.'
+)
 
 
 def student_create(request):
-	level_map = _ensure_reference_data()
+	level_map = reference.level_map()
 	if request.method == 'POST':
 		form = StudentForm(request.POST, request.FILES)
 		if form.is_valid():
@@ -93,7 +51,7 @@ def student_create(request):
 	else:
 		form = StudentForm()
 	level_ids = {k: v.id for k, v in level_map.items()}
-	period_names = [{'value': str(p.id), 'label': str(p)} for p in CoursePeriod.objects.order_by('number')]
+	period_names = reference.period_choices()
 	return render(request, 'core/student_form_clean.html', {
 		'form': form,
 		'level_ids': level_ids,
@@ -103,31 +61,52 @@ def student_create(request):
 	})
 
 
-def student_list(request):
-	"""نمایش لیست دانش‌آموزان با قابلیت جستجو و صفحه‌بندی (20 در هر صفحه)."""
-	level_map = _ensure_reference_data()
+def _student_list_params(request):
+	"""``(level_param, q)``: the level tab (عالی by default) and search box of the student list."""
 	level_param = request.GET.get('level', '').strip()
-	if level_param not in level_map:
+	if level_param not in reference.level_map():
 		level_param = 'aali'
-	q = request.GET.get('q', '').strip()
+	return level_param, request.GET.get('q', '').strip()
+
+
+def _filtered_students(request):
+	"""Students matching the level tab and search box of the student list.
+
+	Returns ``(students, level_param, q, ranked_ids)``; ``ranked_ids`` holds the
+	full-text ranking when a search ran on the FTS index, otherwise None (and
+	the search is already applied to ``students``).
+	"""
+	level_map = reference.level_map()
+	level_param, q = _student_list_params(request)
 	students = Student.objects.all().order_by('-created_at')
 	if level_param in level_map:
 		level_obj = level_map[level_param]
-		students = students.filter(Q(level=level_obj) | Q(level__isnull=True, school_class__level=level_obj))
-	if q:
+		students = students.filter(effective_level=level_obj)
+	ranked_ids = search.search_ids('student', q) if q else None
+	if q and ranked_ids is None:
 		students = students.filter(
-			Q(name__icontains=q) | Q(father_name__icontains=q) | Q(mobile_number__icontains=q)
+			Q(name__icontains=q) | Q(father_name__icontains=q) | Q(mobile_number__icontains=q) | Q(id_number__icontains=q)
 		)
-	students = students.annotate(
-		merit_count=Count('behavior_entries', filter=Q(behavior_entries__entry_type='merit'), distinct=True),
-	)
-	students = students.prefetch_related(
-		Prefetch('behavior_entries', queryset=StudentBehavior.objects.order_by('-created_at'))
-	)
+	return students, level_param, q, ranked_ids
+
+
+def student_list(request):
+	"""نمایش لیست دانش‌آموزان با قابلیت جستجو و صفحه‌بندی (20 در هر صفحه)."""
+	level_param, q = _student_list_params(request)
+	cursor = request.GET.get('cursor')
+
+	def build_page():
+		students, _, _, ranked_ids = _filtered_students(request)
+		filtered = students
+		# only cards missing from the fragment cache read the class
+		students = students.select_related('school_class')
+		if ranked_ids is not None:
+			paginator = RankedPaginator(students, ranked_ids, 10, count_queryset=filtered)
+		else:
+			paginator = KeysetPaginator(students, 10, count_queryset=filtered)
+		return paginator.get_page(cursor)
 
-	paginator = Paginator(students, 10)
-	page_number = request.GET.get('page')
-	page_obj = paginator.get_page(page_number)
+	page_obj = caching.memoize('student_list', STUDENT_LIST_MODELS, [level_param, q, cursor], build_page)
 
 	context = {
 		'q': q,
@@ -137,24 +116,75 @@ def student_list(request):
 	return render(request, 'core/student_list.html', context)
 
 
+def _id_cards_response(request, students, filename, back_url):
+	"""Stream the ID cards of ``students`` as one PDF download.
+
+	The document is written to a spooled temporary file (in memory up to
+	``ID_CARDS_SPOOL_SIZE``, on disk beyond) and sent from there in chunks,
+	so a whole school's cards never sit in memory as one bytes object.
+	"""
+	students = students.select_related('school_class')
+	if not students.exists():
+		messages.error(request, 'دانش‌آموزی برای چاپ کارت یافت نشد.')
+		return redirect(back_url)
+	output = tempfile.SpooledTemporaryFile(max_size=ID_CARDS_SPOOL_SIZE)
+	try:
+		pdf.render_id_cards(students.iterator(chunk_size=200), timezone.localdate(), output)
+	except pdf.PDFUnavailable:
+		output.close()
+		messages.error(request, 'ساخت PDF روی سرور ممکن نیست؛ کتابخانه‌های لازم نصب نشده‌اند.')
+		return redirect(back_url)
+	output.seek(0)
+	# FileResponse closes the file once the body is sent
+	return FileResponse(output, as_attachment=True, filename=filename, content_type='application/pdf')
+
+
+def student_id_cards(request):
+	"""ID cards of every student the list page currently shows (level tab and search)."""
+	students, _, _, ranked_ids = _filtered_students(request)
+	if ranked_ids is not None:
+		students = students.filter(pk__in=ranked_ids)
+	back_url = reverse('core:student_list')
+	if request.GET:
+		back_url += '?' + request.GET.urlencode()
+	return _id_cards_response(request, students.order_by('name'), 'student-id-cards.pdf', back_url)
+
+
+def student_id_card(request, pk):
+	"""ID card of one student, the download behind the card preview on the list page."""
+	student = get_object_or_404(Student, pk=pk)
+	return _id_cards_response(
+		request, Student.objects.filter(pk=student.pk),
+		f'student-{student.pk}-id-card.pdf', reverse('core:student_list'),
+	)
+
+
+def class_id_cards(request, pk):
+	"""ID cards of all students of one class, in name order."""
+	klass = get_object_or_404(SchoolClass, pk=pk)
+	return _id_cards_response(
+		request, klass.students.order_by('name'),
+		f'class-{klass.pk}-id-cards.pdf', reverse('core:classes_list'),
+	)
+
+
 def teacher_list(request):
 	"""نمایش لیست اساتید مشابه لیست دانش‌آموزان با جستجو و صفحه‌بندی."""
 	q = request.GET.get('q', '').strip()
-	teachers = Teacher.objects.all().order_by('-created_at')
-	if q:
-		teachers = teachers.filter(
-			Q(name__icontains=q) | Q(father_name__icontains=q) | Q(id_number__icontains=q)
-		)
-	teachers = teachers.annotate(
-		merit_count=Count('behavior_entries', filter=Q(behavior_entries__entry_type='merit'), distinct=True),
-	)
-	teachers = teachers.prefetch_related(
-		Prefetch('behavior_entries', queryset=TeacherBehavior.objects.order_by('-created_at'))
-	)
+	cursor = request.GET.get('cursor')
+
+	def build_page():
+		teachers = Teacher.objects.all().order_by('-created_at')
+		ranked_ids = search.search_ids('teacher', q) if q else None
+		if q and ranked_ids is None:
+			teachers = teachers.filter(
+				Q(name__icontains=q) | Q(father_name__icontains=q) | Q(id_number__icontains=q)
+			)
+		if ranked_ids is not None:
+			return RankedPaginator(teachers, ranked_ids, 20).get_page(cursor)
+		return KeysetPaginator(teachers, 20, count_queryset=teachers).get_page(cursor)
 
-	paginator = Paginator(teachers, 20)
-	page_number = request.GET.get('page')
-	page_obj = paginator.get_page(page_number)
+	page_obj = caching.memoize('teacher_list', TEACHER_LIST_MODELS, [q, cursor], build_page)
 
 	context = {
 		'q': q,
@@ -203,6 +233,42 @@ def teacher_behavior_add(request):
 	return redirect(next_url)
 
 
+def _behavior_history_response(request, entries):
+	"""Return one page of behavior entries as JSON, newest first.
+
+	Accepts ``type`` (violation/merit) to filter and ``cursor`` from the
+	previous response's ``next`` to continue.
+	"""
+	entry_type = request.GET.get('type')
+	if entry_type in ('violation', 'merit'):
+		entries = entries.filter(entry_type=entry_type)
+	entries = entries.only('id', 'entry_type', 'note', 'created_at')
+	page_obj = KeysetPaginator(entries, 20).get_page(request.GET.get('cursor'))
+	results = [
+		{
+			'id': entry.id,
+			'type': entry.entry_type,
+			'note': entry.note,
+			'created_at': timezone.localtime(entry.created_at).strftime('%Y-%m-%d %H:%M'),
+			'created_at_iso': entry.created_at.isoformat(),
+		}
+		for entry in page_obj.object_list
+	]
+	return JsonResponse({'results': results, 'next': page_obj.next_token})
+
+
+def student_behavior_history(request, pk):
+	"""JSON: سوابق تخلف/امتیاز دانش‌آموز، صفحه‌بندی شده."""
+	student = get_object_or_404(Student.objects.only('id'), pk=pk)
+	return _behavior_history_response(request, StudentBehavior.objects.filter(student=student))
+
+
+def teacher_behavior_history(request, pk):
+	"""JSON: سوابق تخلف/امتیاز استاد، صفحه‌بندی شده."""
+	teacher = get_object_or_404(Teacher.objects.only('id'), pk=pk)
+	return _behavior_history_response(request, TeacherBehavior.objects.filter(teacher=teacher))
+
+
 def student_behavior_update(request, pk):
 	if request.method != 'POST':
 		return JsonResponse({'ok': False}, status=405)
@@ -241,91 +307,70 @@ def teacher_behavior_delete(request, pk):
 
 def student_appreciation_print(request, pk):
 	student = get_object_or_404(Student, pk=pk)
-	merit_count = StudentBehavior.objects.filter(student=student, entry_type='merit').count()
-	if merit_count < 3:
+	if student.merit_count < APPRECIATION_MIN_MERITS:
 		raise Http404()
-	today = timezone.now().date()
-	jy, jm, jd = _gregorian_to_jalali(today.year, today.month, today.day)
 	return render(request, 'core/student_appreciation_print.html', {
 		'student': student,
-		'jalali_date': f"{jy:04d}-{jm:02d}-{jd:02d}",
+		'jalali_date': _jalali_today(),
 	})
 
 
 def teacher_appreciation_print(request, pk):
 	teacher = get_object_or_404(Teacher, pk=pk)
-	merit_count = TeacherBehavior.objects.filter(teacher=teacher, entry_type='merit').count()
-	if merit_count < 3:
+	if teacher.merit_count < APPRECIATION_MIN_MERITS:
 		raise Http404()
-	today = timezone.now().date()
-	jy, jm, jd = _gregorian_to_jalali(today.year, today.month, today.day)
 	return render(request, 'core/teacher_appreciation_print.html', {
 		'teacher': teacher,
-		'jalali_date': f"{jy:04d}-{jm:02d}-{jd:02d}",
+		'jalali_date': _jalali_today(),
 	})
 
 
+def appreciation_batch_print(request):
+	"""All certificates of students and/or teachers with enough merits in one print document.
+
+	``?kind=students`` or ``?kind=teachers`` limits the batch to one group.
+	Merit counts are stored on the rows, so each group is a single query.
+	"""
+	kind = request.GET.get('kind', '')
+	students = teachers = ()
+	if kind != 'teachers':
+		students = (
+			Student.objects.filter(merit_count__gte=APPRECIATION_MIN_MERITS)
+			.select_related('school_class', 'level')
+			.order_by('school_class__name', 'name')
+		)
+	if kind != 'students':
+		teachers = Teacher.objects.filter(merit_count__gte=APPRECIATION_MIN_MERITS).order_by('name')
+	return render(request, 'core/appreciation_batch_print.html', {
+		'students': students,
+		'teachers': teachers,
+		'jalali_date': _jalali_today(),
+	})
+
+
+def _jalali_today() -> str:
+	today = timezone.localdate()
+	jy, jm, jd = dates.gregorian_to_jalali(today.year, today.month, today.day)
+	return f"{jy:04d}-{jm:02d}-{jd:02d}"
+
+
 def teacher_create(request):
 	"""Create a new Teacher. Classes and subjects are provided as searchable tags from frontend."""
-	_ensure_reference_data()
 	if request.method == 'POST':
 		form = TeacherForm(request.POST, request.FILES)
 		if form.is_valid():
 			teacher = form.save()
-			# process classes and subjects provided as repeated fields
-			class_names = request.POST.getlist('classes')
-			subject_names = request.POST.getlist('subjects')
-			semester_values = request.POST.getlist('semesters')
-			level_values = request.POST.getlist('levels')
-			period_values = request.POST.getlist('periods_ebtedai') + request.POST.getlist('periods_moteseta')
-			if class_names:
-				classes_qs = SchoolClass.objects.filter(name__in=class_names)
-				teacher.classes.set(classes_qs)
-			if subject_names:
-				sub_qs = Subject.objects.filter(name__in=subject_names)
-				teacher.subjects.set(sub_qs)
-			# handle semesters: create/get Semester objects for given numbers
-			if semester_values:
-				sem_qs = []
-				for s in semester_values:
-					s_norm = _persian_to_ascii(s.strip())
-					try:
-						num = int(s_norm)
-					except ValueError:
-						continue
-					sem, _ = Semester.objects.get_or_create(number=num)
-					sem_qs.append(sem)
-				teacher.semesters.set(sem_qs)
-			# handle levels
-			if level_values is not None:
-				level_qs = StudyLevel.objects.filter(code__in=level_values)
-				teacher.levels.set(level_qs)
-			# handle periods
-			if period_values:
-				period_qs = []
-				for s in sorted(set(period_values)):
-					s_norm = _persian_to_ascii(s.strip())
-					try:
-						num = int(s_norm)
-					except ValueError:
-						continue
-					per, _ = CoursePeriod.objects.get_or_create(number=num)
-					period_qs.append(per)
-				teacher.periods.set(period_qs)
+			assignments.assign_teacher(teacher, request.POST)
 			messages.success(request, 'استاد با موفقیت ثبت شد.')
 			return redirect(reverse('core:teacher_list'))
 	else:
 		form = TeacherForm()
 
-	class_names = list(SchoolClass.objects.values_list('name', flat=True))
-	subject_names = list(Subject.objects.values_list('name', flat=True))
-	semester_names = [{'value': str(s.number), 'label': str(s)} for s in Semester.objects.order_by('number')]
-	level_names = [{'value': l.code, 'label': l.name} for l in StudyLevel.objects.order_by('id')]
-	period_names = [{'value': str(p.number), 'label': str(p)} for p in CoursePeriod.objects.order_by('number')]
+	semester_names = reference.semester_choices()
+	level_names = reference.level_choices()
+	period_names = reference.period_choices('number')
 	return render(request, 'core/teacher_form.html', {
 		'form': form,
-		'class_names': class_names,
-		'subject_names': subject_names,
 		'semester_names': semester_names,
 		'level_names': level_names,
 		'period_names': period_names,
@@ -333,74 +378,34 @@ def teacher_create(request):
 
 
 def teacher_edit(request, pk):
-	_ensure_reference_data()
 	teacher = get_object_or_404(Teacher, pk=pk)
 	if request.method == 'POST':
 		form = TeacherForm(request.POST, request.FILES, instance=teacher)
 		if form.is_valid():
 			teacher = form.save()
-			class_names = request.POST.getlist('classes')
-			subject_names = request.POST.getlist('subjects')
-			semester_values = request.POST.getlist('semesters')
-			level_values = request.POST.getlist('levels')
-			period_values = request.POST.getlist('periods_ebtedai') + request.POST.getlist('periods_moteseta')
-			if class_names is not None:
-				classes_qs = SchoolClass.objects.filter(name__in=class_names)
-				teacher.classes.set(classes_qs)
-			if subject_names is not None:
-				sub_qs = Subject.objects.filter(name__in=subject_names)
-				teacher.subjects.set(sub_qs)
-			if semester_values is not None:
-				sem_qs = []
-				for s in semester_values:
-					s_norm = _persian_to_ascii(s.strip())
-					try:
-						num = int(s_norm)
-					except ValueError:
-						continue
-					sem, _ = Semester.objects.get_or_create(number=num)
-					sem_qs.append(sem)
-				teacher.semesters.set(sem_qs)
-			if level_values is not None:
-				level_qs = StudyLevel.objects.filter(code__in=level_values)
-				teacher.levels.set(level_qs)
-			if period_values is not None:
-				period_qs = []
-				for s in sorted(set(period_values)):
-					s_norm = _persian_to_ascii(s.strip())
-					try:
-						num = int(s_norm)
-					except ValueError:
-						continue
-					per, _ = CoursePeriod.objects.get_or_create(number=num)
-					period_qs.append(per)
-				teacher.periods.set(period_qs)
+			assignments.assign_teacher(teacher, request.POST)
 			messages.success(request, 'اطلاعات استاد با موفقیت بروزرسانی شد.')
 			return redirect(reverse('core:teacher_list'))
 	else:
 		form = TeacherForm(instance=teacher)
 
-	class_names = list(SchoolClass.objects.values_list('name', flat=True))
-	subject_names = list(Subject.objects.values_list('name', flat=True))
-	# current selections to prefill tags
-	teacher_classes = list(teacher.classes.values_list('name', flat=True))
-	teacher_subjects = list(teacher.subjects.values_list('name', flat=True))
-	teacher_semesters = list(teacher.semesters.values_list('number', flat=True))
+	# current selections to prefill tags; classes and subjects are posted back as ids
+	teacher_classes = [{'value': str(c.id), 'label': c.name} for c in teacher.classes.only('id', 'name')]
+	teacher_subjects = [{'value': str(s.id), 'label': str(s)} for s in teacher.subjects.only('id', 'name', 'semester')]
+	teacher_semesters = terms.to_numbers(teacher.semester_mask)
 	teacher_levels = list(teacher.levels.values_list('code', flat=True))
-	teacher_periods = list(teacher.periods.values_list('number', flat=True))
+	teacher_periods = terms.to_numbers(teacher.period_mask)
 	teacher_periods_ebtedai = []
 	teacher_periods_moteseta = []
 	if 'ebtedai' in teacher_levels:
 		teacher_periods_ebtedai = [str(p) for p in teacher_periods]
 	if 'moteseta' in teacher_levels:
 		teacher_periods_moteseta = [str(p) for p in teacher_periods]
-	semester_names = [{'value': str(s.number), 'label': str(s)} for s in Semester.objects.order_by('number')]
-	level_names = [{'value': l.code, 'label': l.name} for l in StudyLevel.objects.order_by('id')]
-	period_names = [{'value': str(p.number), 'label': str(p)} for p in CoursePeriod.objects.order_by('number')]
+	semester_names = reference.semester_choices()
+	level_names = reference.level_choices()
+	period_names = reference.period_choices('number')
 	return render(request, 'core/teacher_form.html', {
 		'form': form,
-		'class_names': class_names,
-		'subject_names': subject_names,
 		'teacher_classes': teacher_classes,
 		'teacher_subjects': teacher_subjects,
 		'teacher_semesters': [str(s) for s in teacher_semesters],
@@ -427,30 +432,40 @@ def teacher_contract(request, pk):
 	else:
 		form = TeacherContractForm(instance=contract)
 
-	teacher_subjects = ', '.join(teacher.subjects.values_list('name', flat=True)) or '—'
-	teacher_classes = ', '.join(teacher.classes.values_list('name', flat=True)) or '—'
-	teacher_levels = ', '.join(teacher.levels.values_list('name', flat=True)) or '—'
-	teacher_semesters = teacher.get_persian_semesters() or '—'
-	teacher_periods = ' '.join(str(p) for p in teacher.periods.order_by('number')) or '—'
-	default_terms = (
-		'استاد متعهد می‌گردد مطابق نظم داخلی دارالعلوم، '
-		'اوقات رسمی و برنامه درسی را رعایت نموده و در صورت ضرورت '
-		'در جلسات علمی و اداری اشتراک نماید.'
-	)
-
 	return render(request, 'core/teacher_contract.html', {
 		'teacher': teacher,
 		'form': form,
 		'contract': contract,
-		'teacher_subjects': teacher_subjects,
-		'teacher_classes': teacher_classes,
-		'teacher_levels': teacher_levels,
-		'teacher_semesters': teacher_semesters,
-		'teacher_periods': teacher_periods,
-		'default_terms': default_terms,
+		**_contract_details(teacher),
 	})
 
 
+def _contract_details(teacher) -> dict:
+	"""Teacher-side strings shown on the contract preview and printed in its PDF."""
+	return {
+		'teacher_subjects': ', '.join(teacher.subjects.values_list('name', flat=True)) or '—',
+		'teacher_classes': ', '.join(teacher.classes.values_list('name', flat=True)) or '—',
+		'teacher_levels': ', '.join(teacher.levels.values_list('name', flat=True)) or '—',
+		'teacher_semesters': terms.display(teacher.semester_mask, empty='—'),
+		'teacher_periods': terms.display(teacher.period_mask, empty='—'),
+		'default_terms': DEFAULT_CONTRACT_TERMS,
+	}
+
+
+def teacher_contract_pdf(request, pk):
+	"""Download the saved contract as a vector PDF rendered on the server."""
+	teacher = get_object_or_404(Teacher, pk=pk)
+	contract, _ = TeacherContract.objects.get_or_create(teacher=teacher)
+	try:
+		data = pdf.contract_pdf(teacher, contract, _contract_details(teacher))
+	except pdf.PDFUnavailable:
+		messages.error(request, 'ساخت PDF روی سرور ممکن نیست؛ کتابخانه‌های لازم نصب نشده‌اند.')
+		return redirect(reverse('core:teacher_contract', args=[teacher.pk]))
+	response = HttpResponse(data, content_type='application/pdf')
+	response['Content-Disposition'] = f'attachment; filename="teacher-contract-{teacher.pk}.pdf"'
+	return response
+
+
 def teacher_delete(request, pk):
 	teacher = get_object_or_404(Teacher, pk=pk)
 	if request.method == 'POST':
@@ -461,16 +476,13 @@ def teacher_delete(request, pk):
 
 
 def logo(request):
-	"""Serve the app logo stored at core/images/logo.jpg during development.
+	"""Serve the app logo (core/images/logo.jpg) from memory with cache validators."""
+	return bundled.serve(request, 'logo')
 
-	This keeps the template simple and doesn't require moving files into
-	the static directory. In production, serve static assets via a proper
-	static server and remove this view.
-	"""
-	logo_path = os.path.join(settings.BASE_DIR, 'core', 'images', 'logo.jpg')
-	if not os.path.exists(logo_path):
-		raise Http404('Logo not found')
-	return FileResponse(open(logo_path, 'rb'), content_type='image/jpeg')
+
+def font(request):
+	"""Serve the bundled B Nazanin font from memory with cache validators."""
+	return bundled.serve(request, 'font')
 
 
 def subject_list(request):
@@ -478,24 +490,23 @@ def subject_list(request):
 
 	Supports simple name search via ?q= and pagination (20 per page).
 	"""
-	level_map = _ensure_reference_data()
+	level_map = reference.level_map()
 	level_param = request.GET.get('level', '').strip()
 	if level_param not in level_map:
 		level_param = 'aali'
 	q = request.GET.get('q', '').strip()
-	subjects = Subject.objects.all().order_by('-created_at')
-	if level_param in level_map:
-		level_obj = level_map[level_param]
-		if level_obj.code == 'aali':
-			subjects = subjects.filter(Q(level=level_obj) | Q(level__isnull=True))
-		else:
-			subjects = subjects.filter(level=level_obj)
-	if q:
-		subjects = subjects.filter(name__icontains=q)
+	cursor = request.GET.get('cursor')
+
+	def build_page():
+		subjects = Subject.objects.all().order_by('-created_at')
+		if level_param in level_map:
+			subjects = subjects.filter(effective_level=level_map[level_param])
+		if q:
+			subjects = subjects.filter(name__icontains=q)
+		paginator = KeysetPaginator(subjects.select_related('level', 'period'), 20, count_queryset=subjects)
+		return paginator.get_page(cursor)
 
-	paginator = Paginator(subjects, 20)
-	page_number = request.GET.get('page')
-	page_obj = paginator.get_page(page_number)
+	page_obj = caching.memoize('subject_list', SUBJECT_LIST_MODELS, [level_param, q, cursor], build_page)
 
 	context = {
 		'q': q,
@@ -507,7 +518,7 @@ def subject_list(request):
 
 def subject_create(request):
 	"""Create a new Subject (مضمون)."""
-	level_map = _ensure_reference_data()
+	level_map = reference.level_map()
 	if request.method == 'POST':
 		form = SubjectForm(request.POST)
 		if form.is_valid():
@@ -522,7 +533,7 @@ def subject_create(request):
 
 def subject_edit(request, pk):
 	"""Edit an existing Subject."""
-	level_map = _ensure_reference_data()
+	level_map = reference.level_map()
 	subject = get_object_or_404(Subject, pk=pk)
 	if request.method == 'POST':
 		form = SubjectForm(request.POST, instance=subject)
@@ -552,20 +563,22 @@ def classes_list(request):
 	If there is no SchoolClass data yet, the page will show empty state (and the
 	"+ افزودن صنف جدید" button still allows creating new classes).
 	"""
-	level_map = _ensure_reference_data()
+	level_map = reference.level_map()
 	level_param = request.GET.get('level', '').strip()
 	if level_param not in level_map:
 		level_param = 'aali'
 	q = request.GET.get('q', '').strip()
-	classes = SchoolClass.objects.all().order_by('-created_at')
-	if level_param in level_map:
-		classes = classes.filter(level=level_map[level_param])
-	if q:
-		classes = classes.filter(name__icontains=q)
+	cursor = request.GET.get('cursor')
+
+	def build_page():
+		classes = SchoolClass.objects.all().order_by('-created_at')
+		if level_param in level_map:
+			classes = classes.filter(level=level_map[level_param])
+		if q:
+			classes = classes.filter(name__icontains=q)
+		return KeysetPaginator(classes, 20, count_queryset=classes).get_page(cursor)
 
-	paginator = Paginator(classes, 20)
-	page_number = request.GET.get('page')
-	page_obj = paginator.get_page(page_number)
+	page_obj = caching.memoize('classes_list', CLASS_LIST_MODELS, [level_param, q, cursor], build_page)
 
 	context = {
 		'q': q,
@@ -577,48 +590,21 @@ def classes_list(request):
 
 def class_create(request):
 	"""Create a new SchoolClass."""
-	level_map = _ensure_reference_data()
+	level_map = reference.level_map()
 	if request.method == 'POST':
 		form = SchoolClassForm(request.POST)
 		if form.is_valid():
-			klass = form.save()
-			# handle semester value (posted as repeated/hidden field named 'semester')
-			sem_val = request.POST.get('semester')
-			per_val = request.POST.get('period')
-			level_code = klass.level.code if klass.level else ''
-			if level_code == 'aali' and sem_val:
-				# convert Persian digits to ascii if necessary
-				def persian_to_ascii(s: str) -> str:
-					mapping = {'۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4', '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9'}
-					return ''.join(mapping.get(ch, ch) for ch in s)
-				try:
-					num = int(persian_to_ascii(sem_val.strip()))
-				except Exception:
-					num = None
-				if num is not None:
-					sem_obj, _ = Semester.objects.get_or_create(number=num)
-					klass.semester = sem_obj
-			else:
-				klass.semester = None
-			if level_code in ('ebtedai', 'moteseta') and per_val:
-				try:
-					per_id = int(_persian_to_ascii(per_val.strip()))
-				except Exception:
-					per_id = None
-				if per_id is not None:
-					klass.period = CoursePeriod.objects.filter(id=per_id).first()
-			else:
-				klass.period = None
+			klass = form.save(commit=False)
+			# semester (عالی) or period (ابتداییه/متوسطه), posted as hidden fields
+			assignments.assign_class_term(klass, request.POST)
 			klass.save()
 			messages.success(request, 'صنف با موفقیت ثبت شد.')
 			return redirect(reverse('core:classes_list'))
 	else:
 		form = SchoolClassForm()
-	# provide existing semesters from DB so frontend can show them
-	semester_qs = Semester.objects.order_by('number')
-	semester_names = [{'value': str(s.number), 'label': str(s)} for s in semester_qs]
-	period_qs = CoursePeriod.objects.order_by('number')
-	period_names = [{'value': str(p.id), 'label': str(p)} for p in period_qs]
+	# provide existing semesters so frontend can show them
+	semester_names = reference.semester_choices()
+	period_names = reference.period_choices()
 	level_ids = {k: v.id for k, v in level_map.items()}
 	return render(request, 'core/class_form.html', {
 		'form': form,
@@ -630,50 +616,20 @@ def class_create(request):
 
 def class_edit(request, pk):
 	"""Edit an existing SchoolClass."""
-	level_map = _ensure_reference_data()
+	level_map = reference.level_map()
 	klass = get_object_or_404(SchoolClass, pk=pk)
 	if request.method == 'POST':
 		form = SchoolClassForm(request.POST, instance=klass)
 		if form.is_valid():
-			klass = form.save()
-			sem_val = request.POST.get('semester')
-			per_val = request.POST.get('period')
-			level_code = klass.level.code if klass.level else ''
-			if level_code == 'aali' and sem_val is not None:
-				def persian_to_ascii(s: str) -> str:
-					mapping = {'۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4', '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9'}
-					return ''.join(mapping.get(ch, ch) for ch in s)
-				try:
-					num = int(persian_to_ascii(sem_val.strip()))
-				except Exception:
-					num = None
-				if num is not None:
-					sem_obj, _ = Semester.objects.get_or_create(number=num)
-					klass.semester = sem_obj
-				else:
-					klass.semester = None
-			else:
-				klass.semester = None
-			if level_code in ('ebtedai', 'moteseta') and per_val is not None:
-				try:
-					per_id = int(_persian_to_ascii(per_val.strip()))
-				except Exception:
-					per_id = None
-				if per_id is not None:
-					klass.period = CoursePeriod.objects.filter(id=per_id).first()
-				else:
-					klass.period = None
-			else:
-				klass.period = None
+			klass = form.save(commit=False)
+			assignments.assign_class_term(klass, request.POST)
 			klass.save()
 			messages.success(request, 'اطلاعات صنف با موفقیت بروزرسانی شد.')
 			return redirect(reverse('core:classes_list'))
 	else:
 		form = SchoolClassForm(instance=klass)
-	semester_qs = Semester.objects.order_by('number')
-	semester_names = [{'value': str(s.number), 'label': str(s)} for s in semester_qs]
-	period_qs = CoursePeriod.objects.order_by('number')
-	period_names = [{'value': str(p.id), 'label': str(p)} for p in period_qs]
+	semester_names = reference.semester_choices()
+	period_names = reference.period_choices()
 	selected_semester = str(klass.semester.number) if klass.semester else ''
 	selected_period = str(klass.period.id) if klass.period else ''
 	level_ids = {k: v.id for k, v in level_map.items()}
@@ -699,7 +655,7 @@ def class_delete(request, pk):
 
 def student_edit(request, pk):
 	"""Edit an existing student."""
-	level_map = _ensure_reference_data()
+	level_map = reference.level_map()
 	student = get_object_or_404(Student, pk=pk)
 	if request.method == 'POST':
 		form = StudentForm(request.POST, request.FILES, instance=student)
@@ -710,14 +666,19 @@ def student_edit(request, pk):
 	else:
 		form = StudentForm(instance=student)
 	level_ids = {k: v.id for k, v in level_map.items()}
-	period_names = [{'value': str(p.id), 'label': str(p)} for p in CoursePeriod.objects.order_by('number')]
+	period_names = reference.period_choices()
 	student_periods_ebtedai = []
 	student_periods_moteseta = []
-	if student.level:
-		if student.level.code == 'ebtedai':
-			student_periods_ebtedai = [str(p.id) for p in student.periods.all()]
-		elif student.level.code == 'moteseta':
-			student_periods_moteseta = [str(p.id) for p in student.periods.all()]
+	student_level = reference.level_by_id(student.level_id)
+	if student_level and student_level.code in ('ebtedai', 'moteseta'):
+		periods_by_number = reference.get().periods_by_number
+		period_ids = [
+			str(periods_by_number[n].id) for n in terms.to_numbers(student.period_mask) if n in periods_by_number
+		]
+		if student_level.code == 'ebtedai':
+			student_periods_ebtedai = period_ids
+		else:
+			student_periods_moteseta = period_ids
 	return render(request, 'core/student_form_clean.html', {
 		'form': form,
 		'level_ids': level_ids,
@@ -740,37 +701,25 @@ def student_delete(request, pk):
 
 def dashboard(request):
 	"""Dashboard view showing totals and a pie chart of students per class."""
-	level_map = _ensure_reference_data()
-	total_students = Student.objects.count()
-	total_teachers = Teacher.objects.count()
-	total_subjects = Subject.objects.count()
-	total_classes = SchoolClass.objects.count()
+	level_map = reference.level_map()
+	snapshot = stats.get_snapshot()
 
 	# Pie chart: students by gender (مذکر/مونث)
-	male_total = Student.objects.filter(gender='male').count()
-	female_total = Student.objects.filter(gender='female').count()
 	chart_json = mark_safe(json.dumps({
 		'labels': ['مذکر', 'مونث'],
-		'data': [male_total, female_total],
+		'data': [snapshot['gender']['male'], snapshot['gender']['female']],
 	}))
 	# Bar chart: students by level (عالی/متوسطه/ابتداییه)
 	level_order = ['aali', 'moteseta', 'ebtedai']
 	level_labels = [level_map[k].name for k in level_order if k in level_map]
-	level_counts = []
-	for k in level_order:
-		if k not in level_map:
-			continue
-		lv = level_map[k]
-		level_counts.append(
-			Student.objects.filter(Q(level=lv) | Q(level__isnull=True, school_class__level=lv)).count()
-		)
+	level_counts = [snapshot['levels'].get(level_map[k].id, 0) for k in level_order if k in level_map]
 	level_chart_json = mark_safe(json.dumps({'labels': level_labels, 'data': level_counts}))
 
 	context = {
-		'total_students': total_students,
-		'total_teachers': total_teachers,
-		'total_subjects': total_subjects,
-		'total_classes': total_classes,
+		'total_students': snapshot['students'],
+		'total_teachers': snapshot['teachers'],
+		'total_subjects': snapshot['subjects'],
+		'total_classes': snapshot['classes'],
 		'chart_json': chart_json,
 		'level_chart_json': level_chart_json,
 	}
@@ -781,29 +730,9 @@ def grade_entry(request):
 	"""Enter or update grades for a selected student across multiple subjects.
 
 	Frontend sends `student_id`, and arrays `subject_ids[]` and `scores[]`.
+	Students are picked through `api_student_search`, so the page itself
+	does not load the student table.
 	"""
-	students_qs = Student.objects.all().order_by('name')
-	# include semesters list per student for client-side filtering
-	# If the student object has no explicit semesters assigned, fall back to
-	# the semester of the SchoolClass with matching `class_name`.
-	students = []
-	for s in students_qs:
-		sems = list(s.semesters.values_list('number', flat=True)) if hasattr(s, 'semesters') else []
-		# fallback: determine semester from student's school_class -> SchoolClass.semester
-		if not sems:
-			try:
-				if s.school_class and s.school_class.semester:
-					sems = [s.school_class.semester.number]
-			except Exception:
-				# any unexpected issue -> keep sems empty
-				sems = []
-		students.append({
-			'id': s.id,
-			'display': f"{s.name} ({s.father_name})",
-			'semesters': sems,
-			'class_name': s.school_class.name if s.school_class else ''
-		})
-
 	subjects_qs = Subject.objects.order_by('name')
 	# include semester number for each subject
 	subjects = [{'id': sub.id, 'name': sub.name, 'semester': sub.semester} for sub in subjects_qs]
@@ -822,168 +751,301 @@ def grade_entry(request):
 		subject_ids = request.POST.getlist('subject_ids[]') or request.POST.getlist('subject_ids')
 		scores = request.POST.getlist('scores[]') or request.POST.getlist('scores')
 
-		created = 0
-		updated = 0
+		# Validate every row in memory against the subjects loaded above
+		subjects_by_id = {sub['id']: sub for sub in subjects}
 		errors = 0
-		saved_subjects = []  # collect saved subjects info to show on page
-		# Pair up subject_ids and scores by index
+		entries = {}
 		for idx, sid in enumerate(subject_ids):
 			try:
 				sub_id = int(sid)
 			except ValueError:
 				errors += 1
 				continue
-			score_val = None
-			if idx < len(scores):
-				val = scores[idx].strip()
-				try:
-					if val == '':
-						score_val = None
-					else:
-						score_val = int(val)
-						if score_val < 0 or score_val > 100:
-							raise ValueError('score out of range')
-				except Exception:
-					errors += 1
-					continue
-
-			# Try to fetch subject name for display
-			try:
-				subj = Subject.objects.get(pk=sub_id)
-			except Subject.DoesNotExist:
+			score_val, ok = grading.parse_score(scores[idx] if idx < len(scores) else '')
+			if not ok or sub_id not in subjects_by_id:
 				errors += 1
 				continue
-
-			obj, created_flag = StudentScore.objects.update_or_create(
-				student=student, subject_id=sub_id,
-				defaults={'score': score_val}
-			)
-			if created_flag:
-				created += 1
-				op = 'created'
-			else:
-				updated += 1
-				op = 'updated'
-
-			saved_subjects.append({'id': sub_id, 'name': subj.name, 'score': score_val, 'op': op})
+			entries[sub_id] = score_val
+
+		created, updated = grading.save_scores((student.id, sub_id, score_val) for sub_id, score_val in entries.items())
+		saved_subjects = [
+			{
+				'id': sub_id,
+				'name': subjects_by_id[sub_id]['name'],
+				'score': score_val,
+				'op': 'updated' if (student.id, sub_id) in updated else 'created',
+			}
+			for sub_id, score_val in entries.items()
+		]
 
 		# Do not redirect: render the form again and show which subjects were saved
-		messages.success(request, f'عملیات ثبت نمرات انجام شد. ایجاد: {created} — بروزرسانی: {updated} — خطاها: {errors}')
-		# Rebuild subjects list for template render (same as GET below)
-		subjects_qs = Subject.objects.order_by('name')
-		subjects = [{'id': sub.id, 'name': sub.name, 'semester': sub.semester} for sub in subjects_qs]
-		return render(request, 'core/grades_form.html', {'students': students, 'subjects': subjects, 'saved_subjects': saved_subjects, 'saved_student_id': student.id})
+		messages.success(request, f'عملیات ثبت نمرات انجام شد. ایجاد: {len(created)} — بروزرسانی: {len(updated)} — خطاها: {errors}')
+		return render(request, 'core/grades_form.html', {'subjects': subjects, 'saved_subjects': saved_subjects, 'saved_student': student})
 
 	# GET
-	return render(request, 'core/grades_form.html', {'students': students, 'subjects': subjects})
+	return render(request, 'core/grades_form.html', {'subjects': subjects})
 
 
-def api_class_search(request):
-	"""AJAX endpoint for searching SchoolClass by name.
-	
-	Only returns classes that match the search query.
-	If no query provided, returns empty list.
+def _student_summaries(ids) -> list:
+	"""Return typeahead rows for the students in ``ids``, in the same order.
+
+	A single query joins the class and reads the semester masks. A student
+	without semesters of their own falls back to the semester of their
+	class.
+	"""
+	rows = Student.objects.filter(pk__in=ids).values_list(
+		'id', 'name', 'father_name', 'school_class__name', 'school_class__semester_mask', 'semester_mask',
+	)
+	by_id = {
+		pk: {
+			'id': pk,
+			'display': f"{name} ({father_name})",
+			'class_name': class_name or '',
+			'semesters': terms.to_numbers(semester_mask or class_mask or 0),
+		}
+		for pk, name, father_name, class_name, class_mask, semester_mask in rows
+	}
+	return [by_id[pk] for pk in ids if pk in by_id]
+
+
+def api_student_search(request):
+	"""AJAX endpoint for the grade form's student picker.
+
+	Returns `id`, `display`, `class_name` and the effective `semesters` of
+	each matching student, a page at a time. Like `api_class_search` an
+	empty query returns nothing.
 	"""
 	query = request.GET.get('q', '').strip()
-	page = int(request.GET.get('page', 1))
+	try:
+		page = max(int(request.GET.get('page', 1)), 1)
+	except ValueError:
+		page = 1
 	page_size = 20
-	
-	# IMPORTANT: Only search if query is provided
-	# This ensures we NEVER load all classes
+
 	if not query:
-		# Return empty results if no search term
 		return JsonResponse({
 			'results': [],
 			'pagination': {'more': False}
 		})
-	
-	# Filter classes by name (case-insensitive) - ONLY matching classes
-	classes = SchoolClass.objects.filter(name__icontains=query).order_by('name')
-	
-	# Paginate the filtered results
-	start = (page - 1) * page_size
-	end = start + page_size
-	total_count = classes.count()
-	classes_page = classes[start:end]
-	
-	# Format for Select2
-	results = [
-		{'id': c.id, 'text': c.name}
-		for c in classes_page
-	]
-	
-	return JsonResponse({
-		'results': results,
-		'pagination': {
-			'more': end < total_count
+
+	def build_payload():
+		start = (page - 1) * page_size
+		end = start + page_size
+		ranked_ids = search.search_ids('student', query)
+		if ranked_ids is not None:
+			page_ids = ranked_ids[start:end + 1]
+		else:
+			page_ids = list(
+				Student.objects.filter(Q(name__icontains=query) | Q(father_name__icontains=query))
+				.order_by('name', 'id').values_list('id', flat=True)[start:end + 1]
+			)
+		return {
+			'results': _student_summaries(page_ids[:page_size]),
+			'pagination': {
+				'more': len(page_ids) > page_size
+			}
 		}
+
+	return JsonResponse(caching.memoize('api_student_search', (Student, SchoolClass), [query, page], build_payload))
+
+
+def class_gradebook(request, pk):
+	"""Class x subject score matrix: every student of a class for every subject of its semester/period.
+
+	The matrix loads with a fixed number of queries (see `grading.build_gradebook`)
+	and the whole grid is saved with one bulk upsert. Only cells whose value
+	differs from the stored score are written.
+	"""
+	klass = get_object_or_404(SchoolClass.objects.select_related('semester', 'period', 'level'), pk=pk)
+	gradebook = grading.build_gradebook(klass)
+
+	if request.method == 'POST':
+		errors = 0
+		entries = []
+		for student, cells in gradebook.rows():
+			for subject, _ in cells:
+				field = f'score_{student.id}_{subject.id}'
+				if field not in request.POST:
+					continue
+				score_val, ok = grading.parse_score(request.POST[field])
+				if not ok:
+					errors += 1
+					continue
+				pair = (student.id, subject.id)
+				if pair in gradebook.scores:
+					if gradebook.scores[pair] == score_val:
+						continue
+				elif score_val is None:
+					# an empty cell without a stored score is not a change
+					continue
+				entries.append((student.id, subject.id, score_val))
+		created, updated = grading.save_scores(entries)
+		messages.success(request, f'نمرات صنف ثبت شد. ایجاد: {len(created)} — بروزرسانی: {len(updated)} — خطاها: {errors}')
+		return redirect(reverse('core:class_gradebook', args=[klass.pk]))
+
+	return render(request, 'core/class_gradebook.html', {
+		'klass': klass,
+		'subjects': gradebook.subjects,
+		'rows': list(gradebook.rows()),
 	})
 
 
+def class_gradebook_export(request, pk, fmt):
+	"""Stream the class gradebook as CSV or XLSX."""
+	if fmt not in ('csv', 'xlsx'):
+		raise Http404('Unknown export format')
+	klass = get_object_or_404(SchoolClass.objects.select_related('semester'), pk=pk)
+	gradebook = grading.build_gradebook(klass)
+	header = ['نام', 'نام پدر'] + [subject.name for subject in gradebook.subjects]
+	rows = (
+		[student.name, student.father_name] + [score for _, score in cells]
+		for student, cells in gradebook.rows()
+	)
+	if fmt == 'csv':
+		response = StreamingHttpResponse(exports.stream_csv(header, rows), content_type='text/csv; charset=utf-8')
+	else:
+		response = StreamingHttpResponse(
+			exports.stream_xlsx(klass.name, header, rows),
+			content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+		)
+	response['Content-Disposition'] = f'attachment; filename="gradebook-{klass.pk}.{fmt}"'
+	return response
+
+
+def _ranking_query(request):
+	"""Parse `semester`, `class` and `subject` from GET and build the ranking.
+
+	A subject ranks its scores; otherwise students are ranked on their
+	semester average. Returns `(filters, queryset)`.
+	"""
+	def _int(name):
+		return assignments.parse_number(request.GET.get(name, ''))
+
+	semester = _int('semester')
+	if semester not in dict(Subject.SEMESTER_CHOICES):
+		semester = 1
+	class_id, subject_id = _int('class'), _int('subject')
+	klass = SchoolClass.objects.filter(pk=class_id).first() if class_id else None
+	subject = Subject.objects.filter(pk=subject_id).first() if subject_id else None
+	if subject is not None:
+		ranked = rankings.subject_ranking(subject, klass)
+	else:
+		ranked = rankings.semester_ranking(semester, klass)
+	return {'semester': semester, 'klass': klass, 'subject': subject}, ranked
+
+
+def _ranking_params(request) -> list:
+	"""The GET values `_ranking_query` reads, as cache key parts."""
+	return [request.GET.get(name, '') for name in ('semester', 'class', 'subject')]
+
+
+def ranking_list(request):
+	"""لیست رتبه‌بندی دانش‌آموزان بر اساس معدل سمستر یا نمره یک مضمون."""
+	def build_context():
+		filters, ranked = _ranking_query(request)
+		return dict(
+			filters,
+			rows=list(ranked[:RANKING_PAGE_LIMIT]),
+			classes=list(SchoolClass.objects.order_by('name').only('id', 'name')),
+			subjects=list(Subject.objects.order_by('semester', 'name').only('id', 'name', 'semester')),
+		)
+
+	context = caching.memoize('ranking_list', RANKING_MODELS, _ranking_params(request), build_context)
+	context.update(limit=RANKING_PAGE_LIMIT, semesters=Subject.SEMESTER_CHOICES)
+	return render(request, 'core/ranking_list.html', context)
+
+
+def api_rankings(request):
+	"""JSON: ranked students with position, dense rank and percentile.
+
+	Accepts the same filters as `ranking_list` plus `limit` (default 100,
+	at most 1000).
+	"""
+	try:
+		limit = min(max(int(request.GET.get('limit', 100)), 1), 1000)
+	except ValueError:
+		limit = 100
+
+	def build_payload():
+		filters, ranked = _ranking_query(request)
+		return {
+			'semester': filters['semester'] if filters['subject'] is None else filters['subject'].semester,
+			'class_id': filters['klass'].pk if filters['klass'] else None,
+			'subject_id': filters['subject'].pk if filters['subject'] else None,
+			'results': [rankings.as_dict(row) for row in ranked[:limit]],
+		}
+
+	return JsonResponse(caching.memoize('api_rankings', RANKING_MODELS, [*_ranking_params(request), limit], build_payload))
+
+
+def _lookup_response(request, queryset, label):
+	"""A page of ``{'id', 'text'}`` results for objects whose name contains ``q``.
+
+	Like the other search endpoints an empty query returns nothing, so the
+	whole table is never sent. One extra row is read to tell whether
+	another page follows.
+	"""
+	query = request.GET.get('q', '').strip()
+	try:
+		page = max(int(request.GET.get('page', 1)), 1)
+	except ValueError:
+		page = 1
+	page_size = 20
+
+	if not query:
+		return JsonResponse({
+			'results': [],
+			'pagination': {'more': False}
+		})
+
+	def build_payload():
+		start = (page - 1) * page_size
+		rows = list(queryset.filter(name__icontains=query).order_by('name', 'id')[start:start + page_size + 1])
+		return {
+			'results': [{'id': obj.id, 'text': label(obj)} for obj in rows[:page_size]],
+			'pagination': {
+				'more': len(rows) > page_size
+			}
+		}
+
+	name = f'lookup:{queryset.model._meta.model_name}'
+	return JsonResponse(caching.memoize(name, (queryset.model,), [query, page], build_payload))
+
+
+def api_class_search(request):
+	"""AJAX endpoint for the class pickers (student form, teacher form); searches by name."""
+	return _lookup_response(request, SchoolClass.objects.only('id', 'name'), lambda c: c.name)
+
+
+def api_subject_search(request):
+	"""AJAX endpoint for the teacher form's subject picker; searches by name."""
+	return _lookup_response(request, Subject.objects.only('id', 'name', 'semester'), str)
+
+
 def student_exam_results(request, pk):
 	"""Display the latest exam results for a student in a printable format."""
-	from django.db.models import Max
 	from datetime import datetime
-	
-	student = get_object_or_404(Student, pk=pk)
-	
-	# Get the latest semester for this student
-	# First try from student's assigned semesters
-	latest_semester = None
-	if student.semesters.exists():
-		latest_semester = student.semesters.order_by('-number').first()
-	# Fallback to class semester
-	elif student.school_class and student.school_class.semester:
-		latest_semester = student.school_class.semester
-	
-	# Get all scores for subjects in the latest semester
-	scores = []
-	total_score = 0
-	max_possible = 0
-	subjects_count = 0
-	
-	if latest_semester:
-		# Get subjects for this semester
-		subjects = Subject.objects.filter(semester=latest_semester.number).order_by('name')
-		
-		for subject in subjects:
-			# Try to get the score for this student and subject
-			try:
-				student_score = StudentScore.objects.get(student=student, subject=subject)
-				score_value = student_score.score if student_score.score is not None else 0
-			except StudentScore.DoesNotExist:
-				score_value = 0
-			
-			scores.append({
-				'subject_name': subject.name,
-				'score': score_value,
-				'status': 'کامیاب' if score_value >= 55 else 'مردود' if score_value > 0 else '-'
-			})
-			
-			if score_value > 0:
-				total_score += score_value
-				max_possible += 100
-				subjects_count += 1
-	
-	# Calculate percentage and average
-	percentage = (total_score / max_possible * 100) if max_possible > 0 else 0
-	average = (total_score / subjects_count) if subjects_count > 0 else 0
-	overall_status = 'کامیاب' if average >= 55 and subjects_count > 0 else 'مردود' if subjects_count > 0 else 'نامشخص'
-	
-	# Get current date for report
-	current_date = datetime.now().strftime('%Y-%m-%d')
-	
+
+	student = get_object_or_404(exams.result_students(), pk=pk)
 	context = {
-		'student': student,
-		'semester': latest_semester,
-		'scores': scores,
-		'total_score': total_score,
-		'max_possible': max_possible,
-		'percentage': round(percentage, 2),
-		'average': round(average, 2),
-		'overall_status': overall_status,
-		'subjects_count': subjects_count,
-		'current_date': current_date,
+		'result': exams.student_results(student),
+		'current_date': datetime.now().strftime('%Y-%m-%d'),
 	}
-	
 	return render(request, 'core/student_exam_results.html', context)
+
+
+def class_result_sheets(request, pk):
+	"""Printable exam results of every student of a class, one sheet per student.
+
+	Uses `exams.class_results`, so the query count does not depend on the
+	size of the class.
+	"""
+	from datetime import datetime
+
+	klass = get_object_or_404(SchoolClass, pk=pk)
+	context = {
+		'klass': klass,
+		'results': exams.class_results(klass),
+		'current_date': datetime.now().strftime('%Y-%m-%d'),
+	}
+	return render(request, 'core/class_result_sheets.html', context)
@@ -248,8 +248,11 @@ INSTALLED_APPS = [
     'widget_tweaks'
 ]
 
+# whitenoise (and brotli, for the compressed manifest storage below) and the
+# other runtime dependencies are pinned in requirements.txt
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -260,12 +263,21 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'darolOlomMIS.urls'
 
+# Parsed templates are kept in memory outside development; with DEBUG on
+# they are re-read from disk so template edits show up immediately.
+_TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    _TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', _TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': _TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -290,6 +302,21 @@ DATABASES = {
 }
 
 
+# One cache shared by every worker process, kept on local disk so no extra
+# service is needed. Entries are keyed by model generations (see
+# core.caching) and never have to be deleted by hand.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -325,6 +352,7 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # Media files (uploads)
 MEDIA_URL = '/media/'
@@ -333,6 +361,18 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Optionally include a project-level static directory
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# collectstatic writes content-hashed copies plus .gz/.br siblings; WhiteNoise
+# serves them with far-future immutable caching. static/css/app.css is built
+# from frontend/tailwind.css (see the header of that file).
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
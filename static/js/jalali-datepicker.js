@@ -0,0 +1,214 @@
+/*
+ * Minimal Jalali (solar hijri) date picker for inputs marked with data-jdp.
+ *
+ *   jalaliDatepicker.startWatch({ months: [...12 names], persianDigits: true });
+ *
+ * Focusing a watched input opens a month calendar below it; picking a day
+ * writes YYYY/MM/DD into the input and fires "input" and "change".
+ * Mirrors the startWatch() API of @majidh1/jalalidatepicker, which the
+ * contract page used from a CDN.
+ */
+(function () {
+  'use strict';
+
+  const DIGITS = '۰۱۲۳۴۵۶۷۸۹';
+  const WEEKDAYS = ['ش', 'ی', 'د', 'س', 'چ', 'پ', 'ج'];
+  const DEFAULT_MONTHS = ['حمل', 'ثور', 'جوزا', 'سرطان', 'اسد', 'سنبله', 'میزان', 'عقرب', 'قوس', 'جدی', 'دلو', 'حوت'];
+
+  let options = { months: DEFAULT_MONTHS, persianDigits: true };
+  let popup = null;
+  let target = null;
+  let view = null; // [year, month] shown in the popup
+
+  function toLocalDigits(value) {
+    const text = String(value);
+    return options.persianDigits ? text.replace(/[0-9]/g, (d) => DIGITS[d]) : text;
+  }
+
+  function toEnglishDigits(value) {
+    return String(value).replace(/[۰-۹]/g, (d) => DIGITS.indexOf(d));
+  }
+
+  function pad2(n) {
+    return String(n).padStart(2, '0');
+  }
+
+  function gregorianToJalali(gy, gm, gd) {
+    const gdm = [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334];
+    const gy2 = gm > 2 ? gy + 1 : gy;
+    let days = 355666 + 365 * gy + Math.floor((gy2 + 3) / 4) - Math.floor((gy2 + 99) / 100)
+      + Math.floor((gy2 + 399) / 400) + gd + gdm[gm - 1];
+    let jy = -1595 + 33 * Math.floor(days / 12053);
+    days %= 12053;
+    jy += 4 * Math.floor(days / 1461);
+    days %= 1461;
+    if (days > 365) {
+      jy += Math.floor((days - 1) / 365);
+      days = (days - 1) % 365;
+    }
+    const jm = days < 186 ? 1 + Math.floor(days / 31) : 7 + Math.floor((days - 186) / 30);
+    const jd = 1 + (days < 186 ? days % 31 : (days - 186) % 30);
+    return [jy, jm, jd];
+  }
+
+  function jalaliToGregorian(jy, jm, jd) {
+    jy += 1595;
+    let days = -355668 + 365 * jy + Math.floor(jy / 33) * 8 + Math.floor(((jy % 33) + 3) / 4) + jd
+      + (jm < 7 ? (jm - 1) * 31 : (jm - 7) * 30 + 186);
+    let gy = 400 * Math.floor(days / 146097);
+    days %= 146097;
+    if (days > 36524) {
+      gy += 100 * Math.floor(--days / 36524);
+      days %= 36524;
+      if (days >= 365) days++;
+    }
+    gy += 4 * Math.floor(days / 1461);
+    days %= 1461;
+    if (days > 365) {
+      gy += Math.floor((days - 1) / 365);
+      days = (days - 1) % 365;
+    }
+    let gd = days + 1;
+    const leap = (gy % 4 === 0 && gy % 100 !== 0) || gy % 400 === 0;
+    const monthDays = [0, 31, leap ? 29 : 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31];
+    let gm;
+    for (gm = 1; gm <= 12 && gd > monthDays[gm]; gm++) gd -= monthDays[gm];
+    return [gy, gm, gd];
+  }
+
+  function monthLength(jy, jm) {
+    if (jm <= 6) return 31;
+    if (jm <= 11) return 30;
+    // Hoot has 30 days in leap years: day 30 survives the round trip
+    const [gy, gm, gd] = jalaliToGregorian(jy, 12, 30);
+    return gregorianToJalali(gy, gm, gd)[1] === 12 ? 30 : 29;
+  }
+
+  function today() {
+    const now = new Date();
+    return gregorianToJalali(now.getFullYear(), now.getMonth() + 1, now.getDate());
+  }
+
+  function parse(value) {
+    const parts = toEnglishDigits(value || '').trim().split(/[\/\-]/).map((n) => parseInt(n, 10));
+    if (parts.length !== 3 || parts.some((n) => !n)) return null;
+    return parts;
+  }
+
+  function button(text, className, onClick) {
+    const el = document.createElement('button');
+    el.type = 'button';
+    el.className = className;
+    el.textContent = text;
+    el.addEventListener('mousedown', (event) => event.preventDefault());
+    el.addEventListener('click', onClick);
+    return el;
+  }
+
+  function pick(jy, jm, jd) {
+    target.value = toLocalDigits(`${jy}/${pad2(jm)}/${pad2(jd)}`);
+    target.dispatchEvent(new Event('input', { bubbles: true }));
+    target.dispatchEvent(new Event('change', { bubbles: true }));
+    hide();
+  }
+
+  function shift(months) {
+    let [jy, jm] = view;
+    jm += months;
+    if (jm < 1) { jm = 12; jy--; }
+    if (jm > 12) { jm = 1; jy++; }
+    view = [jy, jm];
+    render();
+  }
+
+  function render() {
+    const [jy, jm] = view;
+    const selected = parse(target.value);
+    const now = today();
+    popup.textContent = '';
+
+    const head = document.createElement('div');
+    head.className = 'jdp-head';
+    head.appendChild(button('›', 'jdp-nav', () => shift(-1)));
+    const title = document.createElement('span');
+    title.textContent = `${options.months[jm - 1]} ${toLocalDigits(jy)}`;
+    head.appendChild(title);
+    head.appendChild(button('‹', 'jdp-nav', () => shift(1)));
+    popup.appendChild(head);
+
+    const grid = document.createElement('div');
+    grid.className = 'jdp-grid';
+    WEEKDAYS.forEach((name) => {
+      const cell = document.createElement('span');
+      cell.className = 'jdp-weekday';
+      cell.textContent = name;
+      grid.appendChild(cell);
+    });
+    const [gy, gm, gd] = jalaliToGregorian(jy, jm, 1);
+    const offset = (new Date(gy, gm - 1, gd).getDay() + 1) % 7; // weeks start on Saturday
+    for (let i = 0; i < offset; i++) grid.appendChild(document.createElement('span'));
+    for (let day = 1; day <= monthLength(jy, jm); day++) {
+      let className = 'jdp-day';
+      if (selected && selected[0] === jy && selected[1] === jm && selected[2] === day) className += ' jdp-selected';
+      if (now[0] === jy && now[1] === jm && now[2] === day) className += ' jdp-today';
+      grid.appendChild(button(toLocalDigits(day), className, () => pick(jy, jm, day)));
+    }
+    popup.appendChild(grid);
+
+    const foot = document.createElement('div');
+    foot.className = 'jdp-foot';
+    foot.appendChild(button('امروز', 'jdp-link', () => pick(...now)));
+    foot.appendChild(button('پاک کردن', 'jdp-link', () => {
+      target.value = '';
+      target.dispatchEvent(new Event('input', { bubbles: true }));
+      target.dispatchEvent(new Event('change', { bubbles: true }));
+      hide();
+    }));
+    popup.appendChild(foot);
+  }
+
+  function show(input) {
+    if (!popup) {
+      popup = document.createElement('div');
+      popup.className = 'jdp-popup';
+      popup.setAttribute('dir', 'rtl');
+      popup.addEventListener('mousedown', (event) => event.preventDefault());
+      document.body.appendChild(popup);
+    }
+    target = input;
+    const selected = parse(input.value) || today();
+    view = [selected[0], selected[1]];
+    render();
+    const rect = input.getBoundingClientRect();
+    popup.style.top = `${rect.bottom + window.scrollY + 4}px`;
+    popup.style.left = `${Math.max(4, rect.right + window.scrollX - popup.offsetWidth)}px`;
+    popup.hidden = false;
+  }
+
+  function hide() {
+    if (popup) popup.hidden = true;
+    target = null;
+  }
+
+  function isWatched(el) {
+    return el && el.matches && el.matches('input[data-jdp]');
+  }
+
+  window.jalaliDatepicker = {
+    startWatch(settings) {
+      options = Object.assign({}, options, settings || {});
+      document.addEventListener('focusin', (event) => {
+        if (isWatched(event.target)) show(event.target);
+        else if (!popup || !popup.contains(event.target)) hide();
+      });
+      document.addEventListener('mousedown', (event) => {
+        if (target && event.target !== target && !popup.contains(event.target)) hide();
+      });
+      document.addEventListener('keydown', (event) => {
+        if (event.key === 'Escape' && target) hide();
+      });
+      if (isWatched(document.activeElement)) show(document.activeElement);
+    },
+    hide,
+  };
+})();